@@ -1,10 +1,12 @@
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel, ConfigDict
 from typing import List, Optional, Dict
 import uvicorn
 from app.core.chat_logic import ChatAgent
-from app.core.cart_manager import CartManager, CartItem
+from app.core.cart_manager import CartManager, CartItem, DEFAULT_USER_ID
+from app.core.repair_chain import RepairChain
 import os
 from dotenv import load_dotenv
 import re
@@ -12,13 +14,31 @@ import re
 # Load environment variables
 load_dotenv(os.path.join(os.path.dirname(os.path.dirname(__file__)), 'config', '.env'))
 
+# Part numbers look like PS12345678
+_PART_NO_RE = re.compile(r'PS\d{8}', re.IGNORECASE)
+
+# Intent keywords, matched as whole words so "address" or "added" don't count;
+# cart actions keep "add" ahead of "remove"
+_CART_ACTION_RE = re.compile(r'^(?:(?=.*\badd\b)(?P<add>)|(?=.*\bremove\b)(?P<remove>))', re.IGNORECASE | re.DOTALL)
+_VIEW_CART_RE = re.compile(r'(?:show|view) my cart', re.IGNORECASE)
+_APPLIANCE_RE = re.compile(r'refrigerator|dishwasher')
+
+# Explicit cart commands ("add PS12345678 to my cart") are handled without the LLM.
+# Questions and messages naming both verbs are ambiguous and go to the LLM instead
+_CART_COMMAND_RE = re.compile(
+    r'^(?!.*\?)(?=.*cart)(?=.*PS\d{8})'
+    r'(?:(?=.*\badd\b)(?!.*\bremove\b)|(?=.*\bremove\b)(?!.*\badd\b))',
+    re.IGNORECASE | re.DOTALL
+)
+
 app = FastAPI(
     title="PartSelect Chat API",
     description="API for PartSelect Chat Application",
     version="1.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
-    openapi_url="/openapi.json"
+    openapi_url="/openapi.json",
+    default_response_class=ORJSONResponse
 )
 
 # Add CORS middleware
@@ -33,6 +53,7 @@ app.add_middleware(
 # Initialize chat agent and cart manager
 chat_agent = ChatAgent()
 cart_manager = CartManager()
+repair_chain = RepairChain()
 
 class Message(BaseModel):
     role: str
@@ -40,6 +61,7 @@ class Message(BaseModel):
 
 class ChatRequest(BaseModel):
     messages: List[Message]
+    user_id: str = DEFAULT_USER_ID
 
 class ChatResponse(BaseModel):
     message: Message
@@ -48,6 +70,36 @@ class CartResponse(BaseModel):
     items: List[Dict]
     total: float
 
+_SYSTEM_MESSAGE = Message(
+    role="system",
+    content="""You are a helpful assistant for PartSelect.com. You can help with:
+1. Adding items to cart: When user wants to add an item, use the add_to_cart function with the part number
+2. Removing items from cart: When user wants to remove an item, use the remove_from_cart function
+3. Viewing cart: When user wants to see their cart, use the get_cart function
+4. Repair assistance: For repair questions, use the repair_chain
+5. Product search: For product queries, use the vector_store
+
+Available functions:
+- add_to_cart(part_number, name, price)
+- remove_from_cart(part_number)
+- get_cart()
+- get_cart_total()
+
+Always respond naturally in conversation, but make sure to use these functions when appropriate."""
+)
+
+def _last_user_message(messages: List[Message]) -> Optional[Message]:
+    """Return the most recent user message, if any."""
+    for i in range(len(messages) - 1, -1, -1):
+        if messages[i].role == "user":
+            return messages[i]
+    return None
+
+@app.on_event("shutdown")
+async def shutdown():
+    """Close pooled HTTP connections."""
+    await chat_agent.close()
+
 @app.get("/")
 async def root():
     return {
@@ -61,33 +113,19 @@ async def root():
 async def chat_endpoint(request: ChatRequest):
     try:
         # Extract the last user message
-        user_message = next((msg for msg in reversed(request.messages) if msg.role == "user"), None)
+        user_message = _last_user_message(request.messages)
         if not user_message:
             raise HTTPException(status_code=400, detail="No user message found in the conversation")
         
-        content = user_message.content.lower()
+        # Deterministic cart intents don't need the LLM
+        content = user_message.content
+        if _VIEW_CART_RE.search(content):
+            return await handle_shopping_query(content, request.user_id)
+        if _CART_COMMAND_RE.match(content):
+            return await handle_cart_operation(content, request.user_id)
         
-        # Create system message
-        system_message = Message(
-            role="system",
-            content="""You are a helpful assistant for PartSelect.com. You can help with:
-1. Adding items to cart: When user wants to add an item, use the add_to_cart function with the part number
-2. Removing items from cart: When user wants to remove an item, use the remove_from_cart function
-3. Viewing cart: When user wants to see their cart, use the get_cart function
-4. Repair assistance: For repair questions, use the repair_chain
-5. Product search: For product queries, use the vector_store
-
-Available functions:
-- add_to_cart(part_number, name, price)
-- remove_from_cart(part_number)
-- get_cart()
-- get_cart_total()
-
-Always respond naturally in conversation, but make sure to use these functions when appropriate."""
-        )
-        
-        # Combine system message with request messages
-        messages = [system_message] + request.messages
+        # Combine the shared system message with request messages; the agent only reads them
+        messages = (_SYSTEM_MESSAGE, *request.messages)
         
         # Use the chat agent for response
         response = await chat_agent.generate_response(messages)
@@ -96,37 +134,47 @@ Always respond naturally in conversation, but make sure to use these functions w
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-async def handle_cart_operation(content: str) -> ChatResponse:
+async def handle_cart_operation(content: str, user_id: str = DEFAULT_USER_ID) -> ChatResponse:
     """Handle cart-related operations."""
     # Extract part number
-    part_number = re.search(r'PS\d{8}', content)
+    part_number = _PART_NO_RE.search(content)
     if not part_number:
         return ChatResponse(message=Message(
             role="assistant",
             content="Please provide a valid part number (e.g., PS12345678)."
         ))
     
-    part_number = part_number.group(0)
+    part_number = part_number.group(0).upper()
     
-    # Get product info from database
-    product = await chat_agent.vector_store.get_product_by_part_number(part_number)
-    if not product:
-        return ChatResponse(message=Message(
-            role="assistant",
-            content=f"Product {part_number} not found in our database."
-        ))
+    action_match = _CART_ACTION_RE.match(content)
+    action = action_match.lastgroup if action_match else None
     
-    if "add" in content.lower():
+    # Items already in the cart carry their name and price, so only new items need a product lookup
+    item = cart_manager.get_item(part_number, user_id=user_id)
+    
+    if action == "add":
+        if item:
+            name, price = item.name, item.price
+        else:
+            product = await chat_agent.vector_store.get_product_by_part_number(part_number)
+            if not product:
+                return ChatResponse(message=Message(
+                    role="assistant",
+                    content=f"Product {part_number} not found in our database."
+                ))
+            name, price = product.get('name', ''), float(product.get('price', 0))
+        
         success = cart_manager.add_to_cart(
             part_number=part_number,
-            name=product.get('name', ''),
-            price=float(product.get('price', 0))
+            name=name,
+            price=price,
+            user_id=user_id
         )
         
         if success:
             return ChatResponse(message=Message(
                 role="assistant",
-                content=f"Added {product.get('name', '')} to your cart. You can view your cart by saying 'show my cart' or remove items by saying 'remove {part_number}'."
+                content=f"Added {name} to your cart. You can view your cart by saying 'show my cart' or remove items by saying 'remove {part_number}'."
             ))
         else:
             return ChatResponse(message=Message(
@@ -134,12 +182,18 @@ async def handle_cart_operation(content: str) -> ChatResponse:
                 content="Failed to add item to cart. Please try again."
             ))
     
-    elif "remove" in content.lower():
-        success = cart_manager.remove_from_cart(part_number)
+    elif action == "remove":
+        if not item:
+            return ChatResponse(message=Message(
+                role="assistant",
+                content=f"Product {part_number} is not in your cart."
+            ))
+        
+        success = cart_manager.remove_from_cart(part_number, user_id=user_id)
         if success:
             return ChatResponse(message=Message(
                 role="assistant",
-                content=f"Removed {product.get('name', '')} from your cart."
+                content=f"Removed {item.name} from your cart."
             ))
         else:
             return ChatResponse(message=Message(
@@ -154,9 +208,6 @@ async def handle_cart_operation(content: str) -> ChatResponse:
 
 async def handle_repair_query(content: str) -> ChatResponse:
     """Handle repair-related queries."""
-    from repair_chain import RepairChain
-    repair_chain = RepairChain()
-    
     # Extract appliance type
     appliance_type = "refrigerator" if "refrigerator" in content else "dishwasher"
     
@@ -179,12 +230,12 @@ async def handle_repair_query(content: str) -> ChatResponse:
         content=response_content
     ))
 
-async def handle_shopping_query(content: str) -> ChatResponse:
+async def handle_shopping_query(content: str, user_id: str = DEFAULT_USER_ID) -> ChatResponse:
     """Handle shopping-related queries."""
     # Check for cart operations
-    if "show my cart" in content.lower() or "view my cart" in content.lower():
-        items = cart_manager.get_cart()
-        total = cart_manager.get_cart_total()
+    if _VIEW_CART_RE.search(content):
+        items = cart_manager.get_cart(user_id)
+        total = cart_manager.get_cart_total(user_id)
         
         if not items:
             return ChatResponse(message=Message(
@@ -192,15 +243,13 @@ async def handle_shopping_query(content: str) -> ChatResponse:
                 content="Your cart is empty. You can add items by saying 'add PS12345678'."
             ))
         
-        response = "Here are the items in your cart:\n\n"
-        for item in items:
-            response += f"Part Number: {item.part_number}\n"
-            response += f"Name: {item.name}\n"
-            response += f"Price: ${item.price}\n"
-            response += f"Quantity: {item.quantity}\n\n"
-        
-        response += f"Total: ${total:.2f}\n\n"
-        response += "You can remove items by saying 'remove PS12345678'."
+        parts = ["Here are the items in your cart:\n\n"]
+        parts.extend(
+            f"Part Number: {item.part_number}\nName: {item.name}\nPrice: ${item.price}\nQuantity: {item.quantity}\n\n"
+            for item in items
+        )
+        parts.append(f"Total: ${total:.2f}\n\nYou can remove items by saying 'remove PS12345678'.")
+        response = "".join(parts)
         
         return ChatResponse(message=Message(
             role="assistant",
@@ -208,7 +257,7 @@ async def handle_shopping_query(content: str) -> ChatResponse:
         ))
     
     # Check if the query is about refrigerators or dishwashers
-    if "refrigerator" not in content and "dishwasher" not in content:
+    if not _APPLIANCE_RE.search(content):
         return ChatResponse(message=Message(
             role="assistant",
             content="I can only help with refrigerator and dishwasher parts. Please specify which type of appliance you're looking for."
@@ -223,14 +272,16 @@ async def handle_shopping_query(content: str) -> ChatResponse:
         ))
     
     # Format product suggestions
-    response = "Here are some products that might interest you:\n\n"
-    for product in products[:5]:  # Show top 5 results
-        response += f"Part Number: {product.get('part_number', 'N/A')}\n"
-        response += f"Name: {product.get('name', 'N/A')}\n"
-        response += f"Price: ${product.get('price', 'N/A')}\n"
-        response += f"Description: {product.get('description', 'N/A')}\n\n"
-    
-    response += "You can add any of these items to your cart by saying 'add PS12345678' (replace with the actual part number)."
+    parts = ["Here are some products that might interest you:\n\n"]
+    parts.extend(
+        f"Part Number: {product.get('part_number', 'N/A')}\n"
+        f"Name: {product.get('name', 'N/A')}\n"
+        f"Price: ${product.get('price', 'N/A')}\n"
+        f"Description: {product.get('description', 'N/A')}\n\n"
+        for product in products[:5]  # Show top 5 results
+    )
+    parts.append("You can add any of these items to your cart by saying 'add PS12345678' (replace with the actual part number).")
+    response = "".join(parts)
     
     return ChatResponse(message=Message(
         role="assistant",
@@ -271,10 +322,11 @@ def _format_diagnosis_response(diagnosis: dict) -> str:
     return "\n".join(response_parts)
 
 @app.get("/api/cart", response_model=CartResponse)
-async def get_cart():
+@app.get("/api/cart/{user_id}", response_model=CartResponse)
+async def get_cart(user_id: str = DEFAULT_USER_ID):
     """Get the cart contents."""
-    items = cart_manager.get_cart()
-    total = cart_manager.get_cart_total()
+    items = cart_manager.get_cart(user_id)
+    total = cart_manager.get_cart_total(user_id)
     
     return CartResponse(
         items=[{
@@ -291,4 +343,4 @@ async def health_check():
     return {"status": "healthy"}
 
 if __name__ == "__main__":
-    uvicorn.run("app:app", host="0.0.0.0", port=8000, reload=True) 
\ No newline at end of file
+    uvicorn.run("app.api.main:app", host="0.0.0.0", port=8000, loop="uvloop", http="httptools") 
\ No newline at end of file
@@ -4,108 +4,244 @@ This module manages shopping cart operations for refrigerator and dishwasher par
 
 from typing import Dict, List, Optional
 import logging
-from dataclasses import dataclass
+import threading
+from dataclasses import dataclass, field
+import numpy as np
 
-@dataclass
+# Cart used when the caller does not identify a user
+DEFAULT_USER_ID = "default"
+
+# Arrays grow in chunks of this many items
+_CHUNK_SIZE = 16
+
+@dataclass(slots=True)
 class CartItem:
     part_number: str
     name: str
     price: float
     quantity: int
 
+@dataclass(slots=True)
+class _UserCart:
+    """
+    Struct-of-arrays storage for a single user's cart.
+
+    Removed items leave a tombstone row (part number None, price and quantity
+    zero) so removal is O(1) and the cart keeps its order; tombstones are
+    compacted away once they make up half the rows.
+    """
+    part_numbers: List[Optional[str]] = field(default_factory=list)
+    names: List[Optional[str]] = field(default_factory=list)
+    prices: np.ndarray = field(default_factory=lambda: np.zeros(_CHUNK_SIZE, dtype=np.float64))
+    quantities: np.ndarray = field(default_factory=lambda: np.zeros(_CHUNK_SIZE, dtype=np.int64))
+    index: Dict[str, int] = field(default_factory=dict)  # part number -> row
+    removed: int = 0  # Tombstone rows
+
+    def __len__(self) -> int:
+        """Number of rows in use, tombstones included."""
+        return len(self.part_numbers)
+
+    def compact(self):
+        """Drop tombstone rows, keeping the remaining items in order."""
+        rows = sorted(self.index.values())
+        size = len(self)
+        self.part_numbers = [self.part_numbers[row] for row in rows]
+        self.names = [self.names[row] for row in rows]
+        self.prices[:len(rows)] = self.prices[rows]
+        self.quantities[:len(rows)] = self.quantities[rows]
+        self.prices[len(rows):size] = 0.0
+        self.quantities[len(rows):size] = 0
+        self.index = {part_number: row for row, part_number in enumerate(self.part_numbers)}
+        self.removed = 0
+
 class CartManager:
     def __init__(self):
         self.logger = logging.getLogger(__name__)
-        self.cart: List[CartItem] = []  # Single cart for all users
-        
-    def add_to_cart(self, part_number: str, name: str, price: float, quantity: int = 1) -> bool:
+        self.carts: Dict[str, _UserCart] = {}  # One cart per user id
+        # Held only for in-memory updates, so it never stalls the event loop;
+        # guards against races when routes run in FastAPI's threadpool
+        self._lock = threading.Lock()
+
+    def add_to_cart(self, part_number: str, name: str, price: float, quantity: int = 1,
+                    user_id: str = DEFAULT_USER_ID) -> bool:
         """
         Add an item to the cart.
-        
+
         Args:
             part_number: Part number of the item
             name: Name of the item
             price: Price of the item
             quantity: Quantity to add
-            
+            user_id: Owner of the cart
+
         Returns:
             bool: True if successful, False otherwise
         """
-        try:
-            self.logger.info(f"Adding item to cart: {part_number}, {name}, {price}, {quantity}")
-            
-            # Check if item already exists in cart
-            for item in self.cart:
-                if item.part_number == part_number:
-                    self.logger.info(f"Item already in cart, updating quantity: {item.quantity} -> {item.quantity + quantity}")
-                    item.quantity += quantity
+        with self._lock:
+            try:
+                self.logger.info(f"Adding item to cart: {part_number}, {name}, {price}, {quantity}")
+                cart = self.carts.get(user_id)
+                if cart is None:
+                    cart = self.carts[user_id] = _UserCart()
+
+                # Check if item already exists in cart
+                row = cart.index.get(part_number)
+                if row is not None:
+                    self.logger.info(f"Item already in cart, updating quantity: {cart.quantities[row]} -> {cart.quantities[row] + quantity}")
+                    cart.quantities[row] += quantity
                     return True
-            
-            # Add new item
-            new_item = CartItem(
-                part_number=part_number,
-                name=name,
-                price=price,
-                quantity=quantity
-            )
-            self.logger.info(f"Adding new item to cart: {new_item}")
-            self.cart.append(new_item)
-            return True
-            
-        except Exception as e:
-            self.logger.error(f"Error adding to cart: {str(e)}")
-            return False
-    
-    def remove_from_cart(self, part_number: str) -> bool:
+
+                # Grow the arrays a chunk at a time
+                row = len(cart)
+                if row == len(cart.prices):
+                    cart.prices = np.concatenate([cart.prices, np.zeros(_CHUNK_SIZE, dtype=np.float64)])
+                    cart.quantities = np.concatenate([cart.quantities, np.zeros(_CHUNK_SIZE, dtype=np.int64)])
+
+                # Add new item
+                self.logger.info(f"Adding new item to cart: {part_number}")
+                cart.part_numbers.append(part_number)
+                cart.names.append(name)
+                cart.prices[row] = price
+                cart.quantities[row] = quantity
+                cart.index[part_number] = row
+                return True
+
+            except Exception as e:
+                self.logger.error(f"Error adding to cart: {str(e)}")
+                return False
+
+    def remove_from_cart(self, part_number: str, user_id: str = DEFAULT_USER_ID) -> bool:
         """
         Remove an item from the cart.
-        
+
         Args:
             part_number: Part number of the item to remove
-            
+            user_id: Owner of the cart
+
         Returns:
             bool: True if successful, False otherwise
         """
-        try:
-            self.cart = [
-                item for item in self.cart
-                if item.part_number != part_number
-            ]
-            return True
-            
-        except Exception as e:
-            self.logger.error(f"Error removing from cart: {str(e)}")
-            return False
-    
-    def get_cart(self) -> List[CartItem]:
+        with self._lock:
+            try:
+                cart = self.carts.get(user_id)
+                row = cart.index.pop(part_number, None) if cart is not None else None
+                if row is None:
+                    return True
+
+                # Leave a tombstone in place; zeroed rows keep totals exact
+                cart.part_numbers[row] = None
+                cart.names[row] = None
+                cart.prices[row] = 0.0
+                cart.quantities[row] = 0
+                cart.removed += 1
+                if cart.removed * 2 >= len(cart):
+                    cart.compact()
+                return True
+
+            except Exception as e:
+                self.logger.error(f"Error removing from cart: {str(e)}")
+                return False
+
+    def get_cart(self, user_id: str = DEFAULT_USER_ID) -> List[CartItem]:
         """
         Get the cart contents.
-        
+
+        Args:
+            user_id: Owner of the cart
+
         Returns:
             List of CartItem objects
         """
-        return self.cart
-    
-    def clear_cart(self) -> bool:
+        with self._lock:
+            cart = self.carts.get(user_id)
+            if cart is None:
+                return []
+            return [
+                CartItem(
+                    part_number=part_number,
+                    name=name,
+                    price=float(price),
+                    quantity=int(quantity)
+                )
+                for part_number, name, price, quantity in zip(
+                    cart.part_numbers, cart.names, cart.prices.tolist(), cart.quantities.tolist()
+                )
+                if part_number is not None
+            ]
+
+    def get_item(self, part_number: str, user_id: str = DEFAULT_USER_ID) -> Optional[CartItem]:
+        """
+        Get a single item from the cart.
+
+        Args:
+            part_number: Part number of the item
+            user_id: Owner of the cart
+
+        Returns:
+            The CartItem, or None if it is not in the cart
+        """
+        with self._lock:
+            cart = self.carts.get(user_id)
+            row = cart.index.get(part_number) if cart is not None else None
+            if row is None:
+                return None
+            return CartItem(
+                part_number=part_number,
+                name=cart.names[row],
+                price=float(cart.prices[row]),
+                quantity=int(cart.quantities[row])
+            )
+
+    def clear_cart(self, user_id: str = DEFAULT_USER_ID) -> bool:
         """
         Clear the cart.
-        
+
+        Args:
+            user_id: Owner of the cart
+
         Returns:
             bool: True if successful, False otherwise
         """
-        try:
-            self.cart = []
-            return True
-            
-        except Exception as e:
-            self.logger.error(f"Error clearing cart: {str(e)}")
-            return False
-    
-    def get_cart_total(self) -> float:
+        with self._lock:
+            try:
+                self.carts.pop(user_id, None)
+                return True
+
+            except Exception as e:
+                self.logger.error(f"Error clearing cart: {str(e)}")
+                return False
+
+    def get_cart_total(self, user_id: str = DEFAULT_USER_ID) -> float:
         """
         Calculate the total price of items in the cart.
-        
+
+        Args:
+            user_id: Owner of the cart
+
         Returns:
             float: Total price
         """
-        return sum(item.price * item.quantity for item in self.cart) 
\ No newline at end of file
+        with self._lock:
+            cart = self.carts.get(user_id)
+            if cart is None:
+                return 0.0
+            # Unused rows are zeroed, so the dot over the full arrays is exact
+            return float(cart.prices @ cart.quantities)
+
+    def get_all_cart_totals(self) -> Dict[str, float]:
+        """
+        Calculate the cart total for every user.
+
+        Returns:
+            Dictionary mapping user id to total price
+        """
+        with self._lock:
+            if not self.carts:
+                return {}
+            user_ids = list(self.carts)
+            prices = np.concatenate([self.carts[user_id].prices for user_id in user_ids])
+            quantities = np.concatenate([self.carts[user_id].quantities for user_id in user_ids])
+            # Sum the per-row line totals back into one bucket per user
+            owners = np.repeat(np.arange(len(user_ids)), [len(self.carts[user_id].prices) for user_id in user_ids])
+            totals = np.bincount(owners, weights=prices * quantities, minlength=len(user_ids))
+            return dict(zip(user_ids, totals.tolist()))
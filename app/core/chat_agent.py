@@ -1,9 +1,25 @@
-from typing import List, Dict
+from typing import List, Dict, Optional
 import re
 from app.core.vector_store import VectorStore
 from app.core.search_engine import SearchEngine
 from app.core.repair_chain import RepairChain
 
+# Part numbers look like PS12345678; matched against lowercased content
+_PART_NO_RE = re.compile(r'PS\d{8}', re.IGNORECASE)
+
+# Cart intents in priority order: add, remove, show (each requires "cart")
+_CART_INTENT_RE = re.compile(
+    r'^(?=.*cart)(?:(?=.*add)(?P<add>)|(?=.*remove)(?P<remove>)|(?=.*show)(?P<show>))',
+    re.IGNORECASE | re.DOTALL
+)
+
+def _last_user_message(messages: List[Dict[str, str]]) -> Optional[Dict[str, str]]:
+    """Return the most recent user message, if any."""
+    for i in range(len(messages) - 1, -1, -1):
+        if messages[i].get("role") == "user":
+            return messages[i]
+    return None
+
 class ChatAgent:
     def __init__(self, vector_store, cart_manager, chat_model, logger):
         self.vector_store = vector_store
@@ -15,18 +31,21 @@ class ChatAgent:
         """Generate a response using the chat model."""
         try:
             # Extract the last user message
-            user_message = next((msg for msg in reversed(messages) if msg.get("role") == "user"), None)
+            user_message = _last_user_message(messages)
             if not user_message:
                 return "I didn't receive any message. Please try again."
             
             content = user_message.get("content", "").lower()
             
             # Check for cart operations
-            if "add" in content and "cart" in content:
+            intent_match = _CART_INTENT_RE.match(content)
+            intent = intent_match.lastgroup if intent_match else None
+            
+            if intent == "add":
                 # Extract part number
-                part_number = re.search(r'PS\d{8}', content)
+                part_number = _PART_NO_RE.search(content)
                 if part_number:
-                    part_number = part_number.group(0)
+                    part_number = part_number.group(0).upper()
                     self.logger.info(f"Adding item to cart: {part_number}")
                     
                     # Get product info
@@ -51,11 +70,11 @@ class ChatAgent:
                         self.logger.error(f"Product not found: {part_number}")
                         return f"Product {part_number} not found in our database."
             
-            elif "remove" in content and "cart" in content:
+            elif intent == "remove":
                 # Extract part number
-                part_number = re.search(r'PS\d{8}', content)
+                part_number = _PART_NO_RE.search(content)
                 if part_number:
-                    part_number = part_number.group(0)
+                    part_number = part_number.group(0).upper()
                     self.logger.info(f"Removing item from cart: {part_number}")
                     
                     # Remove from cart
@@ -67,7 +86,7 @@ class ChatAgent:
                         self.logger.error("Failed to remove item from cart")
                         return "I couldn't remove the item from your cart. Please try again."
             
-            elif "show" in content and "cart" in content:
+            elif intent == "show":
                 self.logger.info("Getting cart contents")
                 # Get cart contents
                 items = self.cart_manager.get_cart()
@@ -78,16 +97,13 @@ class ChatAgent:
                 if not items:
                     return "Your cart is empty. You can add items by asking me to add them to your cart."
                 
-                response = "Here are the items in your cart:\n\n"
-                for item in items:
-                    response += f"Part Number: {item.part_number}\n"
-                    response += f"Name: {item.name}\n"
-                    response += f"Price: ${item.price}\n"
-                    response += f"Quantity: {item.quantity}\n\n"
-                
-                response += f"Total: ${total:.2f}\n\n"
-                response += "You can remove items by saying 'remove PS12345678'."
-                return response
+                parts = ["Here are the items in your cart:\n\n"]
+                parts.extend(
+                    f"Part Number: {item.part_number}\nName: {item.name}\nPrice: ${item.price}\nQuantity: {item.quantity}\n\n"
+                    for item in items
+                )
+                parts.append(f"Total: ${total:.2f}\n\nYou can remove items by saying 'remove PS12345678'.")
+                return "".join(parts)
             
             # If no cart operation detected, use the chat model
             return await self.chat_model.generate_response(messages)
@@ -1,18 +1,43 @@
 import os
-from typing import List, Dict, Any, Optional
-import requests
+import asyncio
+import logging
+from typing import List, Dict, Any, Optional, Set
 from app.core.vector_store import VectorStore
 from app.core.search_engine import SearchEngine
 from app.core.repair_chain import RepairChain
 from app.core.scraper import PartSelectScraper
+from app.core.deepseek_client import DeepSeekClient
+from app.utils.cache import InFlight, TTLCache, make_key
 from dotenv import load_dotenv
 import re
 
 # Load environment variables
 load_dotenv(os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'config', '.env'))
 
+_MODEL = "deepseek-chat"
+
+# Part numbers like PS12345678
+_PS_RE = re.compile(r'PS\d{8}')
+
+# Repeated product searches within this many seconds are served from memory
+_SEARCH_CACHE_TTL = 600
+_SEARCH_CACHE_SIZE = 512
+
+# Scraped product pages are kept this long, so follow-up turns reuse them
+_SCRAPE_CACHE_TTL = 600
+_SCRAPE_CACHE_SIZE = 256
+# Prompt size limits: the latest 8 user/assistant turns, and a cap on the
+# product context characters
+_MAX_HISTORY_MESSAGES = 16
+_MAX_CONTEXT_CHARS = 1500
+
+# Background scrapes allowed at once, leaving room for requests that wait on one
+_PREWARM_CONCURRENCY = 4
+
 class ChatAgent:
     def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        
         # Initialize vector store for product information
         self.vector_store = VectorStore()
         
@@ -24,8 +49,19 @@ class ChatAgent:
         if not self.api_key:
             raise ValueError("DEEPSEEK_API_KEY environment variable is not set")
         
-        # API endpoint
-        self.api_endpoint = "https://api.deepseek.com/v1/chat/completions"
+        # Deepseek API client, with retries and a circuit breaker
+        self.deepseek = DeepSeekClient(self.api_key, model=_MODEL)
+        
+        # Recent product search results
+        self._search_cache = TTLCache(maxsize=_SEARCH_CACHE_SIZE, ttl=_SEARCH_CACHE_TTL)
+        
+        # Identical concurrent completions share one upstream call
+        self._in_flight = InFlight()
+        
+        # Scraped product pages, fetched ahead of time for parts the user mentions
+        self._scrape_cache = TTLCache(maxsize=_SCRAPE_CACHE_SIZE, ttl=_SCRAPE_CACHE_TTL)
+        self._prewarm_slots = asyncio.Semaphore(_PREWARM_CONCURRENCY)
+        self._prewarm_tasks: Set[asyncio.Task] = set()  # Keeps background scrapes referenced
         
         # System prompt template
         self.system_prompt = """You are a helpful customer service agent for PartSelect.com, specializing in Refrigerator and Dishwasher parts. 
@@ -42,19 +78,38 @@ For other topics, politely explain that you can only help with refrigerator and
 When providing part recommendations or compatibility information, always reference the product database."""
 
     async def generate_response(self, messages: List[Dict[str, str]]) -> str:
-        # Get relevant product information from vector store
+        key = make_key(_MODEL, *((message.role, message.content) for message in messages))
+        return await self._in_flight.run(key, lambda: self._generate_response(messages))
+
+    async def _generate_response(self, messages: List[Dict[str, str]]) -> str:
         user_query = messages[-1].content
-        relevant_info = await self.vector_store.search_relevant_info(user_query)
-        
-        # If no relevant info found in database, try to scrape additional information
-        if not relevant_info and "part number" in user_query.lower():
-            part_number = self._extract_part_number(user_query)
-            if part_number:
-                product = await self.vector_store.get_product_by_part_number(part_number)
-                if product and product.get('product_url'):
-                    additional_info = await self.scraper.get_additional_info(product['product_url'])
-                    if additional_info:
-                        relevant_info = self._format_additional_info(additional_info)
+        part_number = self._extract_part_number(user_query)
+        
+        # Get relevant product information from vector store, looking up the
+        # mentioned part alongside rather than after it. The encoder is uncased,
+        # so searches are keyed on the normalized query; the catalogue size is
+        # part of the key so added products invalidate old results
+        search = self._search_cache.get_or_fetch(
+            make_key(user_query.lower().strip(), len(self.vector_store.products)),
+            lambda: self.vector_store.search_relevant_info(user_query)
+        )
+        if part_number:
+            relevant_info, product = await asyncio.gather(
+                search, self.vector_store.get_product_by_part_number(part_number)
+            )
+        else:
+            relevant_info, product = await search, None
+        
+        url = product.get('product_url') if product else None
+        if url:
+            # If no relevant info found in database, try to scrape additional information
+            if not relevant_info and "part number" in user_query.lower():
+                additional_info = await self._scrape(url)
+                if additional_info:
+                    relevant_info = self._format_additional_info(additional_info)
+            else:
+                # Scrape in the background so a follow-up about this part finds it ready
+                self._prewarm_scrape(url)
         
         # Prepare messages for API call
         api_messages = [
@@ -65,45 +120,60 @@ When providing part recommendations or compatibility information, always referen
         if relevant_info:
             api_messages.append({
                 "role": "system",
-                "content": f"Relevant product information:\n{relevant_info}"
+                "content": f"Relevant product information:\n{relevant_info[:_MAX_CONTEXT_CHARS]}"
             })
         
-        # Add conversation history
+        # Add conversation history: each distinct system message once, then
+        # only the latest turns so long chats do not grow the prompt without bound
+        seen_system = {message["content"] for message in api_messages}
+        history = []
         for message in messages:
-            api_messages.append({
-                "role": message.role,
-                "content": message.content
-            })
+            if message.role != "system":
+                history.append(message)
+            elif message.content not in seen_system:
+                seen_system.add(message.content)
+                api_messages.append({"role": "system", "content": message.content})
+        
+        api_messages.extend(
+            {"role": message.role, "content": message.content}
+            for message in history[-_MAX_HISTORY_MESSAGES:]
+        )
         
+        return await self.deepseek.chat(api_messages)
+
+    async def close(self):
+        """Stop background scrapes and close pooled HTTP connections."""
+        for task in list(self._prewarm_tasks):
+            task.cancel()
+        await self.deepseek.close()
+
+    async def _scrape(self, url: str, slots: Optional[asyncio.Semaphore] = None) -> Optional[Dict]:
+        """Fetch additional information for a product page, reusing recent and running scrapes."""
+        async def fetch():
+            if slots is None:
+                return await self.scraper.fetch_additional_info([url])
+            async with slots:
+                return await self.scraper.fetch_additional_info([url])
+        
+        return (await self._scrape_cache.get_or_fetch(make_key('fetch_additional_info', url), fetch))[0]
+
+    def _prewarm_scrape(self, url: str):
+        """Start scraping a product page in the background unless it is cached."""
+        if self._scrape_cache.get(make_key('fetch_additional_info', url)) is not None:
+            return
+        task = asyncio.create_task(self._prewarm(url))
+        self._prewarm_tasks.add(task)
+        task.add_done_callback(self._prewarm_tasks.discard)
+
+    async def _prewarm(self, url: str):
         try:
-            # Make API call to Deepseek
-            response = requests.post(
-                self.api_endpoint,
-                headers={
-                    "Authorization": f"Bearer {self.api_key}",
-                    "Content-Type": "application/json"
-                },
-                json={
-                    "model": "deepseek-chat",
-                    "messages": api_messages,
-                    "temperature": 0.7,
-                    "max_tokens": 1000
-                }
-            )
-            
-            response.raise_for_status()
-            result = response.json()
-            
-            # Extract the assistant's response
-            return result["choices"][0]["message"]["content"]
-            
-        except requests.exceptions.RequestException as e:
-            raise Exception(f"Error calling Deepseek API: {str(e)}")
+            await self._scrape(url, slots=self._prewarm_slots)
+        except Exception as e:
+            self.logger.error(f"Error pre-fetching {url}: {str(e)}")
 
     def _extract_part_number(self, query: str) -> Optional[str]:
         """Extract part number from query."""
-        # Simple regex to find part numbers like PS12345678
-        match = re.search(r'PS\d{8}', query)
+        match = _PS_RE.search(query)
         return match.group(0) if match else None
 
     def _format_additional_info(self, info: Dict) -> str:
@@ -0,0 +1,128 @@
+"""
+This module implements the client for the Deepseek chat completions API.
+Transient failures are retried with jittered exponential backoff, and a circuit
+breaker stops calls for a while when the API keeps failing.
+"""
+
+import asyncio
+import logging
+import os
+import random
+import time
+from typing import Dict, List
+import httpx
+import orjson
+from app.core.rate_limiter import AIMDLimiter, CircuitBreaker, CircuitOpenError
+
+_API_ENDPOINT = "https://api.deepseek.com/v1/chat/completions"
+
+# Completions can take a while to generate, so only the read timeout is long
+_REQUEST_TIMEOUT = 60
+_TIMEOUT = httpx.Timeout(connect=3.0, read=_REQUEST_TIMEOUT, write=5.0, pool=5.0)
+
+# Statuses worth retrying; anything else fails straight away
+_RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+_MAX_ATTEMPTS = 4
+_BACKOFF_INITIAL = 0.5
+_BACKOFF_MAX = 8.0
+
+class _RetryableStatus(Exception):
+    def __init__(self, status: int):
+        super().__init__(f"Deepseek API returned status {status}")
+        self.status = status
+
+class DeepSeekClient:
+    def __init__(self, api_key: str, model: str):
+        """
+        Args:
+            api_key: Deepseek API key
+            model: Model used for completions
+        """
+        self.logger = logging.getLogger(__name__)
+        self.model = model
+
+        # HTTP/2 multiplexes concurrent calls over a few pooled connections;
+        # the limiter caps calls in flight and backs off on throttling and slow responses
+        concurrency = int(os.getenv("DEEPSEEK_CONCURRENCY", "16"))
+        self.http = httpx.AsyncClient(
+            http2=True,
+            headers={
+                "Authorization": f"Bearer {api_key}",
+                "Content-Type": "application/json"
+            },
+            timeout=_TIMEOUT,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20, keepalive_expiry=30)
+        )
+        self.limiter = AIMDLimiter(
+            requests_per_window=int(os.getenv("DEEPSEEK_REQUESTS_PER_MINUTE", "600")),
+            max_concurrency=concurrency,
+            target_latency=_REQUEST_TIMEOUT / 2
+        )
+        self.breaker = CircuitBreaker(fail_max=5, reset_timeout=30.0)
+
+    async def chat(self, messages: List[Dict[str, str]], temperature: float = 0.7, max_tokens: int = 1000) -> str:
+        """
+        Generate a completion for the conversation.
+
+        Args:
+            messages: Conversation as role/content dictionaries
+            temperature: Sampling temperature
+            max_tokens: Maximum tokens to generate
+
+        Returns:
+            The assistant's reply
+        """
+        try:
+            self.breaker.check()
+        except CircuitOpenError as e:
+            raise Exception(f"Error calling Deepseek API: {str(e)}")
+
+        payload = {
+            "model": self.model,
+            "messages": messages,
+            "temperature": temperature,
+            "max_tokens": max_tokens
+        }
+        for attempt in range(_MAX_ATTEMPTS):
+            try:
+                result = await self._post(payload)
+
+            except httpx.HTTPStatusError as e:
+                # Client errors such as a bad key will not succeed on retry
+                raise Exception(f"Error calling Deepseek API: {str(e)}")
+
+            except (httpx.TransportError, _RetryableStatus) as e:
+                if attempt == _MAX_ATTEMPTS - 1:
+                    self.breaker.record_failure()
+                    raise Exception(f"Error calling Deepseek API: {str(e)}")
+
+                # Retry-After is honoured by the rate limiter before the next attempt
+                delay = random.uniform(0, min(_BACKOFF_MAX, _BACKOFF_INITIAL * 2 ** attempt))
+                self.logger.warning(f"Deepseek call failed ({str(e)}), retrying in {delay:.2f}s")
+                await asyncio.sleep(delay)
+                continue
+
+            self.breaker.record_success()
+
+            # Extract the assistant's response
+            return result["choices"][0]["message"]["content"]
+
+    async def _post(self, payload: Dict) -> Dict:
+        """Send one completion request and parse the response."""
+        async with self.limiter.slot():
+            start = time.monotonic()
+            try:
+                response = await self.http.post(_API_ENDPOINT, content=orjson.dumps(payload))
+            except httpx.TransportError:
+                self.limiter.note(None, latency=time.monotonic() - start)
+                raise
+            self.limiter.note(response.status_code, response.headers, time.monotonic() - start)
+
+        if response.status_code in _RETRY_STATUSES:
+            raise _RetryableStatus(response.status_code)
+        response.raise_for_status()
+        return orjson.loads(response.content)
+
+    async def close(self):
+        """Close pooled HTTP connections."""
+        await self.http.aclose()
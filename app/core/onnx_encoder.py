@@ -0,0 +1,104 @@
+"""
+This module implements a sentence encoder backed by an int8-quantized ONNX export
+of all-MiniLM-L6-v2. It is a drop-in replacement for SentenceTransformer.encode
+that runs on ONNX Runtime instead of PyTorch.
+
+Create the model directory once with:
+    python -m app.core.onnx_encoder <model_dir>
+"""
+
+import logging
+import os
+import sys
+from typing import List, Union
+import numpy as np
+import onnxruntime as ort
+from transformers import AutoTokenizer
+
+_MODEL_ID = "sentence-transformers/all-MiniLM-L6-v2"
+_MODEL_FILE = "model_int8.onnx"
+
+# The encoder truncates inputs at this many tokens
+_MAX_SEQ_LENGTH = 256
+
+class OnnxEncoder:
+    def __init__(self, model_dir: str):
+        """
+        Args:
+            model_dir: Directory holding the quantized model and its tokenizer
+        """
+        self.logger = logging.getLogger(__name__)
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
+        self.session = ort.InferenceSession(
+            os.path.join(model_dir, _MODEL_FILE),
+            providers=["CPUExecutionProvider"]
+        )
+        self._input_names = {model_input.name for model_input in self.session.get_inputs()}
+
+    def encode(self, texts: Union[str, List[str]], batch_size: int = 32, convert_to_numpy: bool = True,
+               normalize_embeddings: bool = False) -> np.ndarray:
+        """
+        Encode texts into sentence embeddings.
+
+        Args:
+            texts: Text or list of texts to encode
+            batch_size: Number of texts per inference call
+            convert_to_numpy: Accepted for compatibility; results are always NumPy arrays
+            normalize_embeddings: Scale embeddings to unit length
+
+        Returns:
+            Float32 array of shape (len(texts), 384), or (384,) for a single text
+        """
+        single = isinstance(texts, str)
+        if single:
+            texts = [texts]
+
+        # Batch texts of similar length together so little padding is encoded,
+        # then restore the input order
+        order = np.argsort([len(text) for text in texts], kind="stable")
+        sorted_texts = [texts[i] for i in order]
+        batches = [self._encode_batch(sorted_texts[start:start + batch_size], normalize_embeddings)
+                   for start in range(0, len(texts), batch_size)]
+        if not batches:
+            return np.empty((0, 384), dtype=np.float32)
+        embeddings = np.empty((len(texts), batches[0].shape[1]), dtype=np.float32)
+        embeddings[order] = np.concatenate(batches)
+        return embeddings[0] if single else embeddings
+
+    def _encode_batch(self, texts: List[str], normalize: bool) -> np.ndarray:
+        """Run one batch through the model and mean-pool the token embeddings."""
+        encoded = self.tokenizer(texts, padding=True, truncation=True, max_length=_MAX_SEQ_LENGTH, return_tensors="np")
+        inputs = {name: value.astype(np.int64) for name, value in encoded.items() if name in self._input_names}
+        token_embeddings = self.session.run(None, inputs)[0]
+
+        # Average over real tokens only, ignoring padding
+        mask = encoded["attention_mask"][..., None].astype(np.float32)
+        embeddings = (token_embeddings * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+
+        if normalize:
+            embeddings /= np.clip(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12, None)
+        return embeddings.astype(np.float32)
+
+def export_model(model_dir: str):
+    """
+    Export all-MiniLM-L6-v2 to ONNX and quantize its weights to int8.
+
+    Args:
+        model_dir: Directory to write the quantized model and tokenizer to
+    """
+    from optimum.onnxruntime import ORTModelForFeatureExtraction
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    model = ORTModelForFeatureExtraction.from_pretrained(_MODEL_ID, export=True)
+    model.save_pretrained(model_dir)
+    AutoTokenizer.from_pretrained(_MODEL_ID).save_pretrained(model_dir)
+    quantize_dynamic(
+        os.path.join(model_dir, "model.onnx"),
+        os.path.join(model_dir, _MODEL_FILE),
+        weight_type=QuantType.QInt8
+    )
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    export_model(sys.argv[1])
+    logging.getLogger(__name__).info(f"Quantized encoder written to {sys.argv[1]}")
@@ -0,0 +1,161 @@
+"""
+This module implements adaptive rate limiting and circuit breaking for outbound API calls.
+It combines a sliding-window request budget with an AIMD concurrency controller
+that reacts to latency, throttling responses and rate-limit headers.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from email.utils import parsedate_to_datetime
+from typing import AsyncIterator, Mapping, Optional
+
+# Status codes treated as a signal to back off
+_BACKOFF_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+class AIMDLimiter:
+    def __init__(self, requests_per_window: int, window: float = 60.0, min_concurrency: float = 1.0,
+                 max_concurrency: float = 16.0, target_latency: float = 2.0):
+        """
+        Args:
+            requests_per_window: Maximum requests started within any window
+            window: Length of the sliding window in seconds
+            min_concurrency: Lower bound for concurrent requests
+            max_concurrency: Upper bound for concurrent requests
+            target_latency: Responses slower than this (seconds) do not grow concurrency
+        """
+        self.logger = logging.getLogger(__name__)
+        self.requests_per_window = requests_per_window
+        self.window = window
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.target_latency = target_latency
+        self.concurrency = max_concurrency
+        self._started: deque = deque()  # Start times of requests within the window
+        self._blocked_until = 0.0  # Set from Retry-After / exhausted rate-limit headers
+        self._in_flight = 0
+        self._condition: Optional[asyncio.Condition] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _get_condition(self) -> asyncio.Condition:
+        """Create the condition on first use, and again if the event loop has changed."""
+        loop = asyncio.get_running_loop()
+        if self._condition is None or self._loop is not loop:
+            self._condition = asyncio.Condition()
+            self._loop = loop
+            self._in_flight = 0
+        return self._condition
+
+    async def wait_if_throttled(self):
+        """Sleep until the server allows requests again and the window has room."""
+        while True:
+            now = time.monotonic()
+            while self._started and self._started[0] <= now - self.window:
+                self._started.popleft()
+
+            delay = self._blocked_until - now
+            if len(self._started) >= self.requests_per_window:
+                delay = max(delay, self._started[0] + self.window - now)
+            if delay <= 0:
+                self._started.append(now)
+                return
+            await asyncio.sleep(delay)
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Hold one concurrency slot for the duration of a request."""
+        condition = self._get_condition()
+        async with condition:
+            await condition.wait_for(lambda: self._in_flight < max(1, int(self.concurrency)))
+            self._in_flight += 1
+        try:
+            await self.wait_if_throttled()
+            yield
+        finally:
+            async with condition:
+                self._in_flight -= 1
+                condition.notify_all()
+
+    def note(self, status: Optional[int], headers: Optional[Mapping[str, str]] = None, latency: float = 0.0):
+        """
+        Record the outcome of a request. Call while still holding the slot,
+        so its release wakes any waiters if the limit grew.
+
+        Args:
+            status: HTTP status, or None if the request failed without a response
+            headers: Response headers, checked for Retry-After and remaining quota
+            latency: Request duration in seconds
+        """
+        if status is None or status in _BACKOFF_STATUSES:
+            # Multiplicative decrease
+            self.concurrency = max(self.min_concurrency, self.concurrency * 0.5)
+            self.logger.info("Backing off to concurrency %.1f after status %s", self.concurrency, status)
+        elif latency <= self.target_latency:
+            # Additive increase
+            self.concurrency = min(self.max_concurrency, self.concurrency + 0.5)
+
+        if headers:
+            self._apply_headers(headers)
+
+    def _apply_headers(self, headers: Mapping[str, str]):
+        """Block new requests as directed by rate-limit headers."""
+        retry_after = _parse_retry_after(headers.get('Retry-After'))
+        remaining = headers.get('X-RateLimit-Remaining') or headers.get('X-RateLimit-Remaining-Requests')
+        if retry_after is None and remaining is not None and remaining.strip() == '0':
+            # Quota exhausted without a hint: wait one request interval
+            retry_after = self.window / self.requests_per_window
+        if retry_after:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + retry_after)
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header given in seconds or as an HTTP date."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+class CircuitOpenError(Exception):
+    """Raised when a call is refused because the circuit breaker is open."""
+
+class CircuitBreaker:
+    def __init__(self, fail_max: int = 5, reset_timeout: float = 30.0):
+        """
+        Args:
+            fail_max: Consecutive failures that open the breaker
+            reset_timeout: Seconds the breaker stays open before letting calls through again
+        """
+        self.logger = logging.getLogger(__name__)
+        self.fail_max = fail_max
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+
+    @property
+    def is_open(self) -> bool:
+        """Whether calls are currently refused."""
+        return self._opened_at is not None and time.monotonic() - self._opened_at < self.reset_timeout
+
+    def check(self):
+        """Raise CircuitOpenError if calls are currently refused."""
+        if self.is_open:
+            raise CircuitOpenError(f"Circuit open after {self._failures} consecutive failures")
+
+    def record_success(self):
+        self._failures = 0
+        self._opened_at = None
+
+    def record_failure(self):
+        # Once the timeout has passed, the next failure re-opens it straight away
+        self._failures += 1
+        if self._failures >= self.fail_max:
+            if not self.is_open:
+                self.logger.warning(f"Opening circuit for {self.reset_timeout}s after {self._failures} consecutive failures")
+            self._opened_at = time.monotonic()
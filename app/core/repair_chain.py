@@ -3,10 +3,14 @@ This module implements a Chain of Thought based repair diagnosis system.
 It provides structured analysis and solutions for refrigerator and dishwasher repair issues.
 """
 
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
+import copy
+import functools
 import logging
-from dataclasses import dataclass
+import re
+from dataclasses import asdict, dataclass
 from enum import Enum
+from types import MappingProxyType
 from app.core.vector_store import VectorStore
 from app.core.search_engine import SearchEngine
 
@@ -17,7 +21,117 @@ class ProblemType(Enum):
     PLUMBING = "plumbing"
     GENERAL = "general"
 
-@dataclass
+# Problem keywords by category, in priority order: the first category with a
+# keyword in the description wins. Appliance-specific tables are checked before
+# the general one; a refrigerator mention takes precedence over a dishwasher one.
+_APPLIANCE_PROBLEM_KEYWORDS = (
+    ("refrigerator", (
+        (ProblemType.MECHANICAL, ("not cooling", "temperature", "warm", "hot")),
+        (ProblemType.PLUMBING, ("leak", "water", "ice")),
+        (ProblemType.MECHANICAL, ("noise", "sound", "grinding")),
+        (ProblemType.SOFTWARE, ("display", "error", "code")),
+        (ProblemType.ELECTRICAL, ("power", "electric", "circuit")),
+    )),
+    ("dishwasher", (
+        (ProblemType.PLUMBING, ("not draining", "water", "leak")),
+        (ProblemType.ELECTRICAL, ("not starting", "power", "electric")),
+        (ProblemType.SOFTWARE, ("error", "code", "display")),
+        (ProblemType.MECHANICAL, ("noise", "sound", "grinding")),
+    )),
+)
+_GENERAL_PROBLEM_KEYWORDS = (
+    (ProblemType.ELECTRICAL, ("power", "electric", "circuit", "voltage")),
+    (ProblemType.PLUMBING, ("leak", "water", "drain", "pipe")),
+    (ProblemType.SOFTWARE, ("error", "code", "display", "program")),
+    (ProblemType.MECHANICAL, ("noise", "vibration", "movement", "part")),
+)
+
+def _build_problem_type_re():
+    """
+    Compile the keyword tables into one anchored regex. Each category is a
+    lookahead followed by an empty named group, so alternation order encodes
+    priority and match.lastgroup names the winning category.
+    """
+    group_types = {}
+
+    def categories(prefix, table):
+        alternatives = []
+        for i, (problem_type, keywords) in enumerate(table):
+            group = f"{prefix}{i}"
+            group_types[group] = problem_type
+            alternatives.append(f"(?=.*(?:{'|'.join(map(re.escape, keywords))}))(?P<{group}>)")
+        return alternatives
+
+    branches = []
+    excluded = []
+    for appliance, table in _APPLIANCE_PROBLEM_KEYWORDS:
+        guard = "".join(f"(?!.*{other})" for other in excluded)
+        branches.append(f"{guard}(?=.*{appliance})(?:{'|'.join(categories(appliance, table))})")
+        excluded.append(appliance)
+    branches.extend(categories("general", _GENERAL_PROBLEM_KEYWORDS))
+
+    return re.compile(f"^(?:{'|'.join(branches)})", re.DOTALL), group_types
+
+_PROBLEM_TYPE_RE, _PROBLEM_TYPE_GROUPS = _build_problem_type_re()
+
+_COMPLEXITY_KEYWORDS = {
+    "complex": [
+        "circuit", "board", "compressor", "seal", "refrigerant",
+        "leak", "pressure", "control", "system", "wiring"
+    ],
+    "moderate": [
+        "replace", "repair", "adjust", "sensor", "thermostat",
+        "valve", "pump", "motor", "fan", "coil"
+    ],
+    "simple": [
+        "reset", "clean", "basic", "unplug", "plug in",
+        "filter", "drain", "clear", "blockage"
+    ]
+}
+_URGENCY_KEYWORDS = {
+    "high": ["leak", "smoke", "fire", "spark"],
+    "medium": ["not working", "broken", "faulty"],
+    "low": ["noise", "slow", "minor"]
+}
+
+_REPAIR_KEYWORD_RE = re.compile("|".join(map(re.escape, [
+    "repair", "fix", "broken", "not working", "malfunction",
+    "issue", "problem", "fault", "error", "trouble"
+])))
+
+def _compile_levels(levels: Dict[str, List[str]]) -> re.Pattern:
+    """
+    Compile keyword levels into one regex with a named group per level. The
+    alternation sits inside a lookahead so finditer reports every occurrence,
+    including keywords that overlap.
+    """
+    groups = "|".join(f"(?P<{level}>{'|'.join(map(re.escape, keywords))})"
+                      for level, keywords in levels.items())
+    return re.compile(f"(?=(?:{groups}))")
+
+_COMPLEXITY_RE = _compile_levels(_COMPLEXITY_KEYWORDS)
+
+# Urgency only needs the highest level present: each level is a lookahead from
+# the start of the text, tried in priority order, so the first one that finds
+# a keyword anywhere wins and the rest are never scanned
+_URGENCY_RE = re.compile("^(?:" + "|".join(
+    f"(?=.*(?:{'|'.join(map(re.escape, keywords))}))(?P<{level}>)"
+    for level, keywords in _URGENCY_KEYWORDS.items()
+) + ")", re.DOTALL)
+
+def _count_levels(pattern: re.Pattern, text: str) -> Dict[str, int]:
+    """Count keyword occurrences per level in a single scan of the text."""
+    hits = dict.fromkeys(pattern.groupindex, 0)
+    for match in pattern.finditer(text):
+        hits[match.lastgroup] += 1
+    return hits
+
+_DIAGNOSIS_CACHE_SIZE = 512
+
+_SUPPORTED_APPLIANCES = frozenset({"refrigerator", "dishwasher"})
+_UNSUPPORTED_APPLIANCE_MESSAGE = "Currently only support repairs for: refrigerator, dishwasher"
+
+@dataclass(slots=True, frozen=True)
 class DiagnosisStep:
     step_number: int
     description: str
@@ -26,17 +140,240 @@ class DiagnosisStep:
     solution: str
     safety_notes: Optional[str] = None
 
+# Diagnosis steps do not depend on the appliance or the description, so they
+# are built once and shared by every diagnosis
+_ELECTRICAL_STEPS = (
+    # Step 1: Power Supply Check
+    DiagnosisStep(
+        step_number=1,
+        description="Check power supply and connections",
+        possible_causes=["Power cord issue", "Outlet problem", "Circuit breaker tripped"],
+        verification_method="Use multimeter to check voltage",
+        solution="Verify power source and connections",
+        safety_notes="Always disconnect power before inspection"
+    ),
+    # Step 2: Internal Wiring
+    DiagnosisStep(
+        step_number=2,
+        description="Inspect internal wiring and connections",
+        possible_causes=["Loose connections", "Damaged wires", "Faulty components"],
+        verification_method="Visual inspection and continuity test",
+        solution="Repair or replace damaged components",
+        safety_notes="Ensure proper insulation and grounding"
+    ),
+)
+
+_MECHANICAL_STEPS = (
+    # Step 1: Visual Inspection
+    DiagnosisStep(
+        step_number=1,
+        description="Perform visual inspection of moving parts",
+        possible_causes=["Worn components", "Obstructions", "Misalignment"],
+        verification_method="Visual and physical inspection",
+        solution="Clean, lubricate, or replace components",
+        safety_notes="Ensure appliance is unplugged"
+    ),
+    # Step 2: Component Testing
+    DiagnosisStep(
+        step_number=2,
+        description="Test individual mechanical components",
+        possible_causes=["Motor failure", "Belt issues", "Bearing problems"],
+        verification_method="Manual testing and observation",
+        solution="Replace or repair faulty components",
+        safety_notes="Follow manufacturer's guidelines"
+    ),
+)
+
+_SOFTWARE_STEPS = (
+    # Step 1: Error Code Analysis
+    DiagnosisStep(
+        step_number=1,
+        description="Check for error codes and diagnostics",
+        possible_causes=["Software glitch", "Sensor failure", "Control board issue"],
+        verification_method="Check display and error codes",
+        solution="Reset or update software",
+        safety_notes="Backup settings if possible"
+    ),
+    # Step 2: Control System Check
+    DiagnosisStep(
+        step_number=2,
+        description="Inspect control system components",
+        possible_causes=["Faulty sensors", "Control board failure", "Programming error"],
+        verification_method="Diagnostic mode and testing",
+        solution="Replace or reprogram control system",
+        safety_notes="Handle electronic components carefully"
+    ),
+)
+
+_PLUMBING_STEPS = (
+    # Step 1: Leak Detection
+    DiagnosisStep(
+        step_number=1,
+        description="Locate and identify leaks",
+        possible_causes=["Pipe damage", "Seal failure", "Connection issues"],
+        verification_method="Visual inspection and pressure test",
+        solution="Repair or replace damaged components",
+        safety_notes="Turn off water supply before inspection"
+    ),
+    # Step 2: Flow Analysis
+    DiagnosisStep(
+        step_number=2,
+        description="Check water flow and drainage",
+        possible_causes=["Clogged pipes", "Pump failure", "Valve issues"],
+        verification_method="Flow test and inspection",
+        solution="Clear obstructions or replace components",
+        safety_notes="Ensure proper drainage"
+    ),
+)
+
+_GENERAL_STEPS = (
+    # Step 1: Basic Troubleshooting
+    DiagnosisStep(
+        step_number=1,
+        description="Perform basic troubleshooting",
+        possible_causes=["General malfunction", "Multiple issues", "Unknown cause"],
+        verification_method="Systematic testing",
+        solution="Follow manufacturer's troubleshooting guide",
+        safety_notes="Proceed with caution"
+    ),
+)
+
+# Steps converted to the dicts returned by diagnose. Every ProblemType has an
+# entry, so lookups need no fallback
+_DIAGNOSIS_STEPS = MappingProxyType({
+    problem_type: tuple(asdict(step) for step in steps)
+    for problem_type, steps in {
+        ProblemType.ELECTRICAL: _ELECTRICAL_STEPS,
+        ProblemType.MECHANICAL: _MECHANICAL_STEPS,
+        ProblemType.SOFTWARE: _SOFTWARE_STEPS,
+        ProblemType.PLUMBING: _PLUMBING_STEPS,
+        ProblemType.GENERAL: _GENERAL_STEPS
+    }.items()
+})
+
+_BASE_TOOLS = {
+    "refrigerator": ("multimeter", "thermometer", "screwdriver set"),
+    "dishwasher": ("multimeter", "screwdriver set", "pliers")
+}
+_PROBLEM_SPECIFIC_TOOLS = {
+    ProblemType.ELECTRICAL: ("voltage tester", "continuity tester"),
+    ProblemType.MECHANICAL: ("wrench set", "lubricant"),
+    ProblemType.PLUMBING: ("plunger", "drain snake", "bucket"),
+    ProblemType.SOFTWARE: ("user manual", "reset tool"),
+    ProblemType.GENERAL: ("flashlight", "gloves")
+}
+
+# Deduplicated tools for every appliance and problem type
+_INITIAL_TOOLS = {
+    (appliance, problem_type): tuple(dict.fromkeys(base + specific))
+    for appliance, base in _BASE_TOOLS.items()
+    for problem_type, specific in _PROBLEM_SPECIFIC_TOOLS.items()
+}
+
+# General preventive measures and safety notes, followed by type-specific ones
+_PREVENTIVE_MEASURES = {
+    problem_type: (
+        "Regular maintenance and cleaning",
+        "Follow manufacturer's usage guidelines",
+        "Monitor for unusual sounds or behaviors"
+    ) + specific
+    for problem_type, specific in {
+        ProblemType.ELECTRICAL: (
+            "Check power cords regularly",
+            "Use surge protectors",
+            "Avoid overloading circuits"
+        ),
+        ProblemType.MECHANICAL: (
+            "Regular lubrication of moving parts",
+            "Check for wear and tear",
+            "Keep moving parts clean"
+        ),
+        ProblemType.PLUMBING: (
+            "Regular inspection of hoses and connections",
+            "Clean filters and drains",
+            "Monitor water pressure"
+        ),
+        ProblemType.SOFTWARE: (),
+        ProblemType.GENERAL: ()
+    }.items()
+}
+_SAFETY_NOTES = {
+    problem_type: (
+        "Always unplug appliance before inspection",
+        "Wear appropriate safety gear",
+        "Work in a well-ventilated area"
+    ) + specific
+    for problem_type, specific in {
+        ProblemType.ELECTRICAL: (
+            "Use insulated tools",
+            "Check for live wires",
+            "Avoid water contact"
+        ),
+        ProblemType.MECHANICAL: (
+            "Ensure moving parts are stopped",
+            "Use proper lifting techniques",
+            "Secure loose components"
+        ),
+        ProblemType.PLUMBING: (
+            "Turn off water supply",
+            "Have towels ready for spills",
+            "Check for water damage"
+        ),
+        ProblemType.SOFTWARE: (),
+        ProblemType.GENERAL: ()
+    }.items()
+}
+
+# Chain of thought after the two lines describing the problem: potential
+# causes for the problem type, then the diagnostic approach and safety notes
+_CHAIN_OF_THOUGHT_TAILS = {
+    problem_type: causes + (
+        "\nRecommended diagnostic approach:",
+        "1. Start with basic checks (power, connections, visible damage)",
+        "2. Use appropriate tools to verify the issue",
+        "3. Follow systematic troubleshooting steps",
+        "4. Document findings and test results",
+        "\nImportant safety considerations:",
+        "- Always disconnect power before inspection",
+        "- Use appropriate personal protective equipment",
+        "- Follow manufacturer's safety guidelines"
+    )
+    for problem_type, causes in {
+        ProblemType.ELECTRICAL: (
+            "Common electrical issues include:",
+            "- Power supply problems",
+            "- Circuit board malfunctions",
+            "- Wiring issues"
+        ),
+        ProblemType.MECHANICAL: (
+            "Common mechanical issues include:",
+            "- Worn or damaged components",
+            "- Motor or fan problems",
+            "- Mechanical obstructions"
+        ),
+        ProblemType.PLUMBING: (
+            "Common plumbing issues include:",
+            "- Clogged drains or pipes",
+            "- Leaking connections",
+            "- Water pressure problems"
+        ),
+        ProblemType.SOFTWARE: (
+            "Common software/control issues include:",
+            "- Error codes or display problems",
+            "- Control board malfunctions",
+            "- Sensor calibration issues"
+        ),
+        ProblemType.GENERAL: ()
+    }.items()
+}
+
 class RepairChain:
     def __init__(self):
         self.logger = logging.getLogger(__name__)
-        self.problem_types = {
-            ProblemType.ELECTRICAL: self._analyze_electrical,
-            ProblemType.MECHANICAL: self._analyze_mechanical,
-            ProblemType.SOFTWARE: self._analyze_software,
-            ProblemType.PLUMBING: self._analyze_plumbing,
-            ProblemType.GENERAL: self._analyze_general
-        }
-        self.supported_appliances = ["refrigerator", "dishwasher"]
+
+        # Diagnosis is deterministic in its inputs, so repeated questions are served
+        # from a per-instance cache
+        self._diagnose_cached = functools.lru_cache(maxsize=_DIAGNOSIS_CACHE_SIZE)(self._diagnose)
 
     def diagnose(self, appliance_type: str, problem_description: str) -> Dict:
         """
@@ -51,42 +388,63 @@ class RepairChain:
         Returns:
             Dictionary containing the diagnosis steps and recommendations
         """
+        # Callers get their own copy so changes never reach the cache or the step tables
+        return copy.deepcopy(self._diagnose_cached(appliance_type, problem_description))
+
+    def diagnose_many(self, queries: List[Tuple[str, str]]) -> List[Dict]:
+        """
+        Diagnose a batch of problems, e.g. when classifying stored conversations.
+        Repeated queries, within the batch or seen before, are served from the cache.
+        
+        Args:
+            queries: (appliance_type, problem_description) pairs
+            
+        Returns:
+            One diagnosis dictionary per query, in order
+        """
+        diagnose_cached = self._diagnose_cached
+        return [copy.deepcopy(diagnose_cached(appliance_type, problem_description))
+                for appliance_type, problem_description in queries]
+
+    def cache_clear(self):
+        """Drop all cached diagnoses."""
+        self._diagnose_cached.cache_clear()
+
+    def _diagnose(self, appliance_type: str, problem_description: str) -> Dict:
+        """Compute a diagnosis; see diagnose."""
         try:
             # Check if appliance type is supported
-            if appliance_type.lower() not in self.supported_appliances:
+            if appliance_type.lower() not in _SUPPORTED_APPLIANCES:
                 return {
                     "error": "unsupported_appliance",
-                    "message": f"Currently only support repairs for: {', '.join(self.supported_appliances)}"
+                    "message": _UNSUPPORTED_APPLIANCE_MESSAGE
                 }
             
-            # Check if the problem is repair-related
-            repair_keywords = [
-                "repair", "fix", "broken", "not working", "malfunction",
-                "issue", "problem", "fault", "error", "trouble"
-            ]
+            # Keyword matching is case-insensitive; lowercase once for every check
+            problem_lower = problem_description.lower()
             
-            if not any(keyword in problem_description.lower() for keyword in repair_keywords):
+            # Check if the problem is repair-related
+            if not _REPAIR_KEYWORD_RE.search(problem_lower):
                 return {
                     "error": "not_repair_related",
                     "message": "This appears to be a non-repair related issue. Please describe the repair problem."
                 }
             
             # Step 1: Problem Analysis
-            problem_type = self._determine_problem_type(problem_description)
-            self.logger.info(f"Problem type determined: {problem_type.value}")
+            problem_type = self._determine_problem_type(problem_lower)
+            self.logger.info("Problem type determined: %s", problem_type.value)
             
             # Step 2: Initial Assessment
-            initial_assessment = self._create_initial_assessment(appliance_type, problem_description)
+            initial_assessment = self._create_initial_assessment(appliance_type, problem_description, problem_lower, problem_type)
             
             # Step 3: Detailed Analysis using Chain of Thought
-            analysis_method = self.problem_types.get(problem_type, self._analyze_general)
-            diagnosis_steps = analysis_method(appliance_type, problem_description)
+            diagnosis_steps = _DIAGNOSIS_STEPS[problem_type]
             
             # Step 4: Compile Results
             result = {
                 "problem_type": problem_type.value,
                 "initial_assessment": initial_assessment,
-                "diagnosis_steps": [step.__dict__ for step in diagnosis_steps],
+                "diagnosis_steps": list(diagnosis_steps),
                 "preventive_measures": self._get_preventive_measures(appliance_type, problem_type),
                 "safety_notes": self._get_safety_notes(appliance_type, problem_type),
                 "chain_of_thought": self._generate_chain_of_thought(appliance_type, problem_description, problem_type)
@@ -101,199 +459,27 @@ class RepairChain:
                 "message": "Unable to complete diagnosis due to an unexpected error"
             }
 
-    def _determine_problem_type(self, problem_description: str) -> ProblemType:
-        """Determine the type of problem based on description."""
-        problem_lower = problem_description.lower()
-        
-        # Refrigerator specific checks
-        if "refrigerator" in problem_lower:
-            if any(word in problem_lower for word in ["not cooling", "temperature", "warm", "hot"]):
-                return ProblemType.MECHANICAL
-            elif any(word in problem_lower for word in ["leak", "water", "ice"]):
-                return ProblemType.PLUMBING
-            elif any(word in problem_lower for word in ["noise", "sound", "grinding"]):
-                return ProblemType.MECHANICAL
-            elif any(word in problem_lower for word in ["display", "error", "code"]):
-                return ProblemType.SOFTWARE
-            elif any(word in problem_lower for word in ["power", "electric", "circuit"]):
-                return ProblemType.ELECTRICAL
-        
-        # Dishwasher specific checks
-        elif "dishwasher" in problem_lower:
-            if any(word in problem_lower for word in ["not draining", "water", "leak"]):
-                return ProblemType.PLUMBING
-            elif any(word in problem_lower for word in ["not starting", "power", "electric"]):
-                return ProblemType.ELECTRICAL
-            elif any(word in problem_lower for word in ["error", "code", "display"]):
-                return ProblemType.SOFTWARE
-            elif any(word in problem_lower for word in ["noise", "sound", "grinding"]):
-                return ProblemType.MECHANICAL
-        
-        # General checks
-        if any(word in problem_lower for word in ["power", "electric", "circuit", "voltage"]):
-            return ProblemType.ELECTRICAL
-        elif any(word in problem_lower for word in ["leak", "water", "drain", "pipe"]):
-            return ProblemType.PLUMBING
-        elif any(word in problem_lower for word in ["error", "code", "display", "program"]):
-            return ProblemType.SOFTWARE
-        elif any(word in problem_lower for word in ["noise", "vibration", "movement", "part"]):
-            return ProblemType.MECHANICAL
-        else:
-            return ProblemType.GENERAL
+    def _determine_problem_type(self, problem_lower: str) -> ProblemType:
+        """Determine the type of problem based on the lowercased description."""
+        # A single match walks the keyword tables in priority order
+        match = _PROBLEM_TYPE_RE.match(problem_lower)
+        return _PROBLEM_TYPE_GROUPS[match.lastgroup] if match else ProblemType.GENERAL
 
-    def _create_initial_assessment(self, appliance_type: str, problem_description: str) -> Dict:
+    def _create_initial_assessment(self, appliance_type: str, problem_description: str,
+                                   problem_lower: str, problem_type: ProblemType) -> Dict:
         """Create initial assessment of the problem."""
         return {
             "appliance": appliance_type,
             "problem": problem_description,
-            "complexity": self._assess_complexity(problem_description),
-            "urgency": self._assess_urgency(problem_description),
-            "tools_needed": self._get_initial_tools(appliance_type, self._determine_problem_type(problem_description))
+            "complexity": self._assess_complexity(problem_lower),
+            "urgency": self._assess_urgency(problem_lower),
+            "tools_needed": self._get_initial_tools(appliance_type, problem_type)
         }
 
-    def _analyze_electrical(self, appliance_type: str, problem_description: str) -> List[DiagnosisStep]:
-        """Analyze electrical problems."""
-        steps = []
-        
-        # Step 1: Power Supply Check
-        steps.append(DiagnosisStep(
-            step_number=1,
-            description="Check power supply and connections",
-            possible_causes=["Power cord issue", "Outlet problem", "Circuit breaker tripped"],
-            verification_method="Use multimeter to check voltage",
-            solution="Verify power source and connections",
-            safety_notes="Always disconnect power before inspection"
-        ))
-        
-        # Step 2: Internal Wiring
-        steps.append(DiagnosisStep(
-            step_number=2,
-            description="Inspect internal wiring and connections",
-            possible_causes=["Loose connections", "Damaged wires", "Faulty components"],
-            verification_method="Visual inspection and continuity test",
-            solution="Repair or replace damaged components",
-            safety_notes="Ensure proper insulation and grounding"
-        ))
-        
-        return steps
-
-    def _analyze_mechanical(self, appliance_type: str, problem_description: str) -> List[DiagnosisStep]:
-        """Analyze mechanical problems."""
-        steps = []
-        
-        # Step 1: Visual Inspection
-        steps.append(DiagnosisStep(
-            step_number=1,
-            description="Perform visual inspection of moving parts",
-            possible_causes=["Worn components", "Obstructions", "Misalignment"],
-            verification_method="Visual and physical inspection",
-            solution="Clean, lubricate, or replace components",
-            safety_notes="Ensure appliance is unplugged"
-        ))
-        
-        # Step 2: Component Testing
-        steps.append(DiagnosisStep(
-            step_number=2,
-            description="Test individual mechanical components",
-            possible_causes=["Motor failure", "Belt issues", "Bearing problems"],
-            verification_method="Manual testing and observation",
-            solution="Replace or repair faulty components",
-            safety_notes="Follow manufacturer's guidelines"
-        ))
-        
-        return steps
-
-    def _analyze_software(self, appliance_type: str, problem_description: str) -> List[DiagnosisStep]:
-        """Analyze software/control problems."""
-        steps = []
-        
-        # Step 1: Error Code Analysis
-        steps.append(DiagnosisStep(
-            step_number=1,
-            description="Check for error codes and diagnostics",
-            possible_causes=["Software glitch", "Sensor failure", "Control board issue"],
-            verification_method="Check display and error codes",
-            solution="Reset or update software",
-            safety_notes="Backup settings if possible"
-        ))
-        
-        # Step 2: Control System Check
-        steps.append(DiagnosisStep(
-            step_number=2,
-            description="Inspect control system components",
-            possible_causes=["Faulty sensors", "Control board failure", "Programming error"],
-            verification_method="Diagnostic mode and testing",
-            solution="Replace or reprogram control system",
-            safety_notes="Handle electronic components carefully"
-        ))
-        
-        return steps
-
-    def _analyze_plumbing(self, appliance_type: str, problem_description: str) -> List[DiagnosisStep]:
-        """Analyze plumbing-related problems."""
-        steps = []
-        
-        # Step 1: Leak Detection
-        steps.append(DiagnosisStep(
-            step_number=1,
-            description="Locate and identify leaks",
-            possible_causes=["Pipe damage", "Seal failure", "Connection issues"],
-            verification_method="Visual inspection and pressure test",
-            solution="Repair or replace damaged components",
-            safety_notes="Turn off water supply before inspection"
-        ))
-        
-        # Step 2: Flow Analysis
-        steps.append(DiagnosisStep(
-            step_number=2,
-            description="Check water flow and drainage",
-            possible_causes=["Clogged pipes", "Pump failure", "Valve issues"],
-            verification_method="Flow test and inspection",
-            solution="Clear obstructions or replace components",
-            safety_notes="Ensure proper drainage"
-        ))
-        
-        return steps
+    def _assess_complexity(self, problem_lower: str) -> str:
+        """Assess the complexity of the problem from the lowercased description."""
+        matches = _count_levels(_COMPLEXITY_RE, problem_lower)
 
-    def _analyze_general(self, appliance_type: str, problem_description: str) -> List[DiagnosisStep]:
-        """General analysis for undefined problems."""
-        steps = []
-        
-        # Step 1: Basic Troubleshooting
-        steps.append(DiagnosisStep(
-            step_number=1,
-            description="Perform basic troubleshooting",
-            possible_causes=["General malfunction", "Multiple issues", "Unknown cause"],
-            verification_method="Systematic testing",
-            solution="Follow manufacturer's troubleshooting guide",
-            safety_notes="Proceed with caution"
-        ))
-        
-        return steps
-
-    def _assess_complexity(self, problem_description: str) -> str:
-        """Assess the complexity of the problem."""
-        complexity_keywords = {
-            "simple": [
-                "reset", "clean", "basic", "unplug", "plug in",
-                "filter", "drain", "clear", "blockage"
-            ],
-            "moderate": [
-                "replace", "repair", "adjust", "sensor", "thermostat",
-                "valve", "pump", "motor", "fan", "coil"
-            ],
-            "complex": [
-                "circuit", "board", "compressor", "seal", "refrigerant",
-                "leak", "pressure", "control", "system", "wiring"
-            ]
-        }
-        
-        problem_lower = problem_description.lower()
-        
-        # Count matches for each complexity level
-        matches = {level: sum(1 for keyword in keywords if keyword in problem_lower)
-                  for level, keywords in complexity_keywords.items()}
-        
         # Determine complexity based on matches
         if matches["complex"] > 0:
             return "complex"
@@ -304,149 +490,32 @@ class RepairChain:
         else:
             return "unknown"
 
-    def _assess_urgency(self, problem_description: str) -> str:
-        """Assess the urgency of the problem."""
-        urgency_keywords = {
-            "high": ["leak", "smoke", "fire", "spark"],
-            "medium": ["not working", "broken", "faulty"],
-            "low": ["noise", "slow", "minor"]
-        }
-        
-        problem_lower = problem_description.lower()
-        for level, keywords in urgency_keywords.items():
-            if any(keyword in problem_lower for keyword in keywords):
-                return level
-        return "unknown"
+    def _assess_urgency(self, problem_lower: str) -> str:
+        """Assess the urgency of the problem from the lowercased description."""
+        match = _URGENCY_RE.match(problem_lower)
+        return match.lastgroup if match else "unknown"
 
     def _get_initial_tools(self, appliance_type: str, problem_type: ProblemType) -> List[str]:
         """Get initial tools needed based on appliance type and problem type."""
-        base_tools = {
-            "refrigerator": ["multimeter", "thermometer", "screwdriver set"],
-            "dishwasher": ["multimeter", "screwdriver set", "pliers"]
-        }
-        
-        problem_specific_tools = {
-            ProblemType.ELECTRICAL: ["voltage tester", "continuity tester"],
-            ProblemType.MECHANICAL: ["wrench set", "lubricant"],
-            ProblemType.PLUMBING: ["plunger", "drain snake", "bucket"],
-            ProblemType.SOFTWARE: ["user manual", "reset tool"],
-            ProblemType.GENERAL: ["flashlight", "gloves"]
-        }
-        
-        tools = base_tools.get(appliance_type.lower(), [])
-        tools.extend(problem_specific_tools.get(problem_type, []))
-        
-        return list(set(tools))  # Remove duplicates
+        tools = _INITIAL_TOOLS.get((appliance_type.lower(), problem_type))
+        if tools is None:
+            tools = _PROBLEM_SPECIFIC_TOOLS[problem_type]
+        return list(tools)
 
     def _get_preventive_measures(self, appliance_type: str, problem_type: ProblemType) -> List[str]:
         """Get preventive measures based on appliance and problem type."""
-        measures = []
-        
-        # General measures
-        measures.extend([
-            "Regular maintenance and cleaning",
-            "Follow manufacturer's usage guidelines",
-            "Monitor for unusual sounds or behaviors"
-        ])
-        
-        # Type-specific measures
-        if problem_type == ProblemType.ELECTRICAL:
-            measures.extend([
-                "Check power cords regularly",
-                "Use surge protectors",
-                "Avoid overloading circuits"
-            ])
-        elif problem_type == ProblemType.MECHANICAL:
-            measures.extend([
-                "Regular lubrication of moving parts",
-                "Check for wear and tear",
-                "Keep moving parts clean"
-            ])
-        elif problem_type == ProblemType.PLUMBING:
-            measures.extend([
-                "Regular inspection of hoses and connections",
-                "Clean filters and drains",
-                "Monitor water pressure"
-            ])
-            
-        return measures
+        return list(_PREVENTIVE_MEASURES[problem_type])
 
     def _get_safety_notes(self, appliance_type: str, problem_type: ProblemType) -> List[str]:
         """Get safety notes based on appliance and problem type."""
-        notes = []
-        
-        # General safety notes
-        notes.extend([
-            "Always unplug appliance before inspection",
-            "Wear appropriate safety gear",
-            "Work in a well-ventilated area"
-        ])
-        
-        # Type-specific notes
-        if problem_type == ProblemType.ELECTRICAL:
-            notes.extend([
-                "Use insulated tools",
-                "Check for live wires",
-                "Avoid water contact"
-            ])
-        elif problem_type == ProblemType.MECHANICAL:
-            notes.extend([
-                "Ensure moving parts are stopped",
-                "Use proper lifting techniques",
-                "Secure loose components"
-            ])
-        elif problem_type == ProblemType.PLUMBING:
-            notes.extend([
-                "Turn off water supply",
-                "Have towels ready for spills",
-                "Check for water damage"
-            ])
-            
-        return notes
+        return list(_SAFETY_NOTES[problem_type])
 
     def _generate_chain_of_thought(self, appliance_type: str, problem_description: str, problem_type: ProblemType) -> List[str]:
         """Generate a chain of thought analysis for the problem."""
-        chain = []
-        
-        # Initial observation
-        chain.append(f"Observing that the {appliance_type} has the following issue: {problem_description}")
-        
-        # Problem categorization
-        chain.append(f"Based on the description, this appears to be a {problem_type.value} problem")
-        
-        # Potential causes
-        if problem_type == ProblemType.ELECTRICAL:
-            chain.append("Common electrical issues include:")
-            chain.append("- Power supply problems")
-            chain.append("- Circuit board malfunctions")
-            chain.append("- Wiring issues")
-        elif problem_type == ProblemType.MECHANICAL:
-            chain.append("Common mechanical issues include:")
-            chain.append("- Worn or damaged components")
-            chain.append("- Motor or fan problems")
-            chain.append("- Mechanical obstructions")
-        elif problem_type == ProblemType.PLUMBING:
-            chain.append("Common plumbing issues include:")
-            chain.append("- Clogged drains or pipes")
-            chain.append("- Leaking connections")
-            chain.append("- Water pressure problems")
-        elif problem_type == ProblemType.SOFTWARE:
-            chain.append("Common software/control issues include:")
-            chain.append("- Error codes or display problems")
-            chain.append("- Control board malfunctions")
-            chain.append("- Sensor calibration issues")
-        
-        # Diagnostic approach
-        chain.append("\nRecommended diagnostic approach:")
-        chain.append("1. Start with basic checks (power, connections, visible damage)")
-        chain.append("2. Use appropriate tools to verify the issue")
-        chain.append("3. Follow systematic troubleshooting steps")
-        chain.append("4. Document findings and test results")
-        
-        # Safety considerations
-        chain.append("\nImportant safety considerations:")
-        chain.append("- Always disconnect power before inspection")
-        chain.append("- Use appropriate personal protective equipment")
-        chain.append("- Follow manufacturer's safety guidelines")
-        
-        return chain 
\ No newline at end of file
+        return [
+            # Initial observation
+            f"Observing that the {appliance_type} has the following issue: {problem_description}",
+            # Problem categorization
+            f"Based on the description, this appears to be a {problem_type.value} problem",
+            *_CHAIN_OF_THOUGHT_TAILS[problem_type]
+        ]
\ No newline at end of file
@@ -10,10 +10,8 @@ from bs4 import BeautifulSoup
 from typing import Dict, List, Optional
 import re
 import asyncio
-from aiohttp import ClientSession, TCPConnector
+from aiohttp import ClientSession, ClientTimeout, TCPConnector
 import logging
-import random
-import time
 import os
 import shutil
 from selenium import webdriver
@@ -26,7 +24,35 @@ from webdriver_manager.chrome import ChromeDriverManager
 from webdriver_manager.core.os_manager import ChromeType
 from app.core.vector_store import VectorStore
 
+# lxml's C parser is much faster than the pure-Python html.parser backend
+_HTML_PARSER = 'lxml'
+
+_USER_AGENT = 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+
+# Concurrent connections and per-request timeout for plain HTTP fetches
+_MAX_CONNECTIONS = 32
+_FETCH_TIMEOUT = ClientTimeout(total=20)
+
 class PartSelectScraper:
+    # Story containers, tried in order until one matches
+    _STORY_SELECTORS = (
+        'div[class*="repair"]',
+        'div[class*="story"]',
+        'div[class*="fix"]',
+        'div[class*="solution"]'
+    )
+    
+    # Tags and class patterns for the parts of a story
+    _TITLE_TAGS = ('h2', 'h3', 'h4', 'div')
+    _TITLE_RE = re.compile(r'title|heading', re.IGNORECASE)
+    _INSTRUCTION_TAGS = ('div', 'p')
+    _INSTRUCTION_RE = re.compile(r'instruction|content|text', re.IGNORECASE)
+    _PARTS_TAGS = ('div', 'ul')
+    _PARTS_RE = re.compile(r'part|component', re.IGNORECASE)
+    _PART_ITEM_TAGS = ('a', 'li', 'span')
+    
+    _VIDEO_HOST_RE = re.compile(r'youtube\.com|vimeo\.com')
+
     def __init__(self):
         self.base_url = "https://www.partselect.com"
         self.logger = logging.getLogger(__name__)
@@ -38,7 +64,7 @@ class PartSelectScraper:
         self.chrome_options.add_argument('--disable-dev-shm-usage')
         self.chrome_options.add_argument('--disable-gpu')
         self.chrome_options.add_argument('--window-size=1920,1080')
-        self.chrome_options.add_argument('--user-agent=Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36')
+        self.chrome_options.add_argument(f'--user-agent={_USER_AGENT}')
         
         # Initialize driver
         self.driver = None
@@ -76,8 +102,10 @@ class PartSelectScraper:
                 EC.presence_of_element_located((By.TAG_NAME, "body"))
             )
             
-            # Wait for page to be fully loaded with a longer delay
-            time.sleep(5)
+            # Wait for the page to finish loading rather than for a fixed delay
+            WebDriverWait(self.driver, 20).until(
+                lambda driver: driver.execute_script("return document.readyState") == "complete"
+            )
             
             # Log the page source for debugging
             self.logger.debug("Page source after initial load:")
@@ -96,9 +124,9 @@ class PartSelectScraper:
                 except Exception as e:
                     if attempt < max_attempts - 1:
                         self.logger.debug(f"Attempt {attempt + 1} failed, trying to scroll and wait")
-                        # Scroll to bottom to trigger loading
+                        # Scroll to bottom to trigger loading; the next attempt's wait
+                        # polls for the section, so no fixed sleep is needed
                         self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-                        time.sleep(3)
                     else:
                         self.logger.warning("Could not find repair section after all attempts")
             
@@ -118,17 +146,10 @@ class PartSelectScraper:
             return stories
             
         try:
-            soup = BeautifulSoup(html_content, 'html.parser')
+            soup = BeautifulSoup(html_content, _HTML_PARSER)
             
             # Try different selectors to find repair stories
-            selectors = [
-                'div[class*="repair"]',
-                'div[class*="story"]',
-                'div[class*="fix"]',
-                'div[class*="solution"]'
-            ]
-            
-            for selector in selectors:
+            for selector in self._STORY_SELECTORS:
                 repair_stories = soup.select(selector)
                 if repair_stories:
                     self.logger.debug(f"Found {len(repair_stories)} stories using selector: {selector}")
@@ -137,13 +158,13 @@ class PartSelectScraper:
             for story in repair_stories:
                 try:
                     # Get title - try different possible selectors
-                    title = story.find(['h2', 'h3', 'h4', 'div'], {'class': lambda x: x and ('title' in x.lower() or 'heading' in x.lower())})
+                    title = story.find(self._TITLE_TAGS, {'class': self._TITLE_RE})
                     
                     # Get instruction - try different possible selectors
-                    instruction = story.find(['div', 'p'], {'class': lambda x: x and ('instruction' in x.lower() or 'content' in x.lower() or 'text' in x.lower())})
+                    instruction = story.find(self._INSTRUCTION_TAGS, {'class': self._INSTRUCTION_RE})
                     
                     # Get parts used - try different possible selectors
-                    parts = story.find(['div', 'ul'], {'class': lambda x: x and ('part' in x.lower() or 'component' in x.lower())})
+                    parts = story.find(self._PARTS_TAGS, {'class': self._PARTS_RE})
                     
                     if title or instruction:
                         story_data = {
@@ -156,7 +177,7 @@ class PartSelectScraper:
                         # Add parts used if available
                         if parts:
                             parts_list = []
-                            for part in parts.find_all(['a', 'li', 'span']):
+                            for part in parts.find_all(self._PART_ITEM_TAGS):
                                 part_name = part.get_text(strip=True)
                                 if part_name:
                                     parts_list.append(part_name)
@@ -183,7 +204,7 @@ class PartSelectScraper:
             return None
             
         try:
-            soup = BeautifulSoup(html_content, 'html.parser')
+            soup = BeautifulSoup(html_content, _HTML_PARSER)
             
             # First try to find video in the repair video section
             video_section = soup.find('div', {'id': 'repair-video'}) or \
@@ -192,7 +213,7 @@ class PartSelectScraper:
             
             if video_section:
                 # Try to find iframe with video
-                iframe = video_section.find('iframe', {'src': lambda x: x and ('youtube.com' in x or 'vimeo.com' in x)})
+                iframe = video_section.find('iframe', {'src': self._VIDEO_HOST_RE})
                 if iframe and iframe.get('src'):
                     return iframe['src']
                 
@@ -208,7 +229,7 @@ class PartSelectScraper:
             
             # If no video found in repair video section, try searching the entire page
             # Look for any iframe with video URL
-            iframe = soup.find('iframe', {'src': lambda x: x and ('youtube.com' in x or 'vimeo.com' in x)})
+            iframe = soup.find('iframe', {'src': self._VIDEO_HOST_RE})
             if iframe and iframe.get('src'):
                 return iframe['src']
             
@@ -239,13 +260,56 @@ class PartSelectScraper:
             "repair_stories": self.extract_repair_stories(html_content)
         }
 
+    async def fetch_many(self, urls: List[str]) -> List[Optional[str]]:
+        """Fetch several pages concurrently over plain HTTP, without a browser."""
+        async with ClientSession(
+            connector=TCPConnector(limit=_MAX_CONNECTIONS),
+            headers={'User-Agent': _USER_AGENT},
+            timeout=_FETCH_TIMEOUT
+        ) as session:
+            return await asyncio.gather(*(self._fetch_page(session, url) for url in urls))
+
+    async def _fetch_page(self, session: ClientSession, url: str) -> Optional[str]:
+        """Fetch a single page, returning None on failure."""
+        try:
+            async with session.get(url) as response:
+                response.raise_for_status()
+                return await response.text()
+        except Exception as e:
+            self.logger.error(f"Error fetching page {url}: {str(e)}")
+            return None
+
+    async def fetch_additional_info(self, product_urls: List[str]) -> List[Dict]:
+        """
+        Get repair stories for several product pages concurrently.
+        
+        Pages are fetched with aiohttp first. Selenium is only used as a fallback
+        for pages that yield no stories, and only when a driver has been started.
+        
+        Args:
+            product_urls: Product page URLs
+            
+        Returns:
+            List of dictionaries in the same order as product_urls
+        """
+        pages = await self.fetch_many(product_urls)
+        results = []
+        for product_url, html_content in zip(product_urls, pages):
+            stories = self.extract_repair_stories(html_content)
+            if not stories and self.driver:
+                self.logger.debug(f"No stories from plain fetch, falling back to Selenium: {product_url}")
+                html_content = await asyncio.to_thread(self.get_product_page, product_url)
+                stories = self.extract_repair_stories(html_content)
+            results.append({"repair_stories": stories})
+        return results
+
     def search_repair_stories(self, query: str) -> List[Dict]:
         """Search for repair stories matching the query."""
         try:
             search_url = f"{self.base_url}/Search.aspx?SearchTerm={query}"
             html_content = self.get_product_page(search_url)
             if html_content:
-                soup = BeautifulSoup(html_content, 'html.parser')
+                soup = BeautifulSoup(html_content, _HTML_PARSER)
                 # Extract relevant stories from search results
                 # Implementation depends on the actual search results page structure
                 return []
@@ -3,14 +3,38 @@ This module implements search functionality using Bing Web Search API.
 It provides a way to search for repair information and related content.
 """
 
-import requests
+import asyncio
 from typing import Dict, List, Optional
 import logging
-from urllib.parse import quote_plus
-import time
-import random
+import re
 import os
+import aiohttp
+import orjson
 from app.core.vector_store import VectorStore
+from app.core.rate_limiter import AIMDLimiter
+from app.utils.cache import TTLCache, make_key
+from app.utils.http_cache import DiskHTTPCache
+from app.utils.http_client import AsyncHTTPClient
+
+_USER_AGENT = 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+
+# Total timeout in seconds for Bing calls
+_REQUEST_TIMEOUT = 10
+
+# Repeated searches within this many seconds are served from memory
+_CACHE_TTL = 300
+_CACHE_SIZE = 1024
+
+# Repair stories come from discussion sites; Bing restricts results to these
+_STORY_URL_KEYWORDS = ('forum', 'community', 'discussion', 'reddit')
+_STORY_URL_FILTER = " OR ".join(f"inurl:{keyword}" for keyword in _STORY_URL_KEYWORDS)
+_STORY_URL_RE = re.compile('|'.join(_STORY_URL_KEYWORDS), re.IGNORECASE)
+_STORY_COUNT = 5
+
+_SOURCE = 'Bing Web Search'
+
+# Query parameters shared by every search
+_SEARCH_PARAMS = {'responseFilter': 'Webpages', 'textFormat': 'Raw', 'answerCount': 1}
 
 class SearchEngine:
     def __init__(self):
@@ -22,10 +46,31 @@ class SearchEngine:
             
         self.headers = {
             'Ocp-Apim-Subscription-Key': self.subscription_key,
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+            'User-Agent': _USER_AGENT
         }
+        
+        # Pooled async connections, with a cap on concurrent Bing calls;
+        # the limiter paces requests from Bing's responses instead of a fixed delay
+        concurrency = int(os.getenv('BING_CONCURRENCY', '8'))
+        self.client = AsyncHTTPClient(
+            self.headers,
+            concurrency=concurrency,
+            timeout=_REQUEST_TIMEOUT,
+            limiter=AIMDLimiter(
+                requests_per_window=int(os.getenv('BING_REQUESTS_PER_MINUTE', '180')),
+                max_concurrency=concurrency
+            ),
+            retries=3
+        )
+        
+        # Recent results; concurrent identical searches share one request
+        self._cache = TTLCache(maxsize=_CACHE_SIZE, ttl=_CACHE_TTL)
+        
+        # Optional on-disk cache of Bing responses, kept across restarts
+        cache_dir = os.getenv('BING_CACHE_DIR')
+        self._disk_cache = DiskHTTPCache(cache_dir, ttl=_CACHE_TTL) if cache_dir else None
 
-    def search_repair_info(self, query: str, max_results: int = 5) -> List[Dict]:
+    async def search_repair_info(self, query: str, max_results: int = 5) -> List[Dict]:
         """
         Search for repair information using Bing Web Search API.
         
@@ -39,39 +84,37 @@ class SearchEngine:
         try:
             # Add repair-related keywords to improve search results
             enhanced_query = f"{query} repair guide fix solution"
+            key = make_key('search_repair_info', enhanced_query, max_results)
+            return await self._cache.get_or_fetch(
+                key, lambda: self._fetch_repair_info(query, enhanced_query, max_results)
+            )
             
-            # Construct the search URL
-            search_url = f"{self.base_url}?q={quote_plus(enhanced_query)}&count={max_results}&responseFilter=Webpages"
-            
-            # Add random delay to avoid rate limiting
-            time.sleep(random.uniform(1, 2))
-            
-            # Make the request
-            response = requests.get(search_url, headers=self.headers)
-            response.raise_for_status()
-            
-            # Parse the response
-            data = response.json()
-            
-            results = []
-            
-            # Extract web search results
-            for item in data.get('webPages', {}).get('value', [])[:max_results]:
-                results.append({
-                    'title': item.get('name', ''),
-                    'description': item.get('snippet', ''),
-                    'url': item.get('url', ''),
-                    'source': 'Bing Web Search'
-                })
-            
-            self.logger.info(f"Found {len(results)} results for query: {query}")
-            return results
-            
-        except Exception as e:
+        except (aiohttp.ClientError, asyncio.TimeoutError, orjson.JSONDecodeError) as e:
+            # Network and API failures degrade to no results; other errors are bugs and propagate
             self.logger.error(f"Error searching for repair info: {str(e)}")
             return []
 
-    def search_repair_stories(self, query: str) -> List[Dict]:
+    async def _fetch_repair_info(self, query: str, enhanced_query: str, max_results: int) -> List[Dict]:
+        """Request repair information from Bing and parse the results."""
+        items = await self._web_search(enhanced_query, max_results)
+        
+        # Extract web search results
+        get = dict.get
+        results = [
+            {
+                'title': get(item, 'name', ''),
+                'description': get(item, 'snippet', ''),
+                'url': get(item, 'url', ''),
+                'source': _SOURCE
+            }
+            for item in items[:max_results]
+        ]
+        
+        # Lazy %-formatting skips building the message when INFO is disabled
+        self.logger.info("Found %d results for query: %s", len(results), query)
+        return results
+
+    async def search_repair_stories(self, query: str) -> List[Dict]:
         """
         Search specifically for repair stories and experiences.
         
@@ -83,37 +126,69 @@ class SearchEngine:
         """
         try:
             # Add keywords to find repair stories
-            enhanced_query = f"{query} repair story experience fix solution forum"
-            
-            # Construct the search URL
-            search_url = f"{self.base_url}?q={quote_plus(enhanced_query)}&count=10&responseFilter=Webpages"
-            
-            # Add random delay to avoid rate limiting
-            time.sleep(random.uniform(1, 2))
-            
-            # Make the request
-            response = requests.get(search_url, headers=self.headers)
-            response.raise_for_status()
-            
-            # Parse the response
-            data = response.json()
+            enhanced_query = f"{query} repair story experience fix solution ({_STORY_URL_FILTER})"
+            key = make_key('search_repair_stories', enhanced_query, _STORY_COUNT)
+            return await self._cache.get_or_fetch(
+                key, lambda: self._fetch_repair_stories(query, enhanced_query)
+            )
             
-            stories = []
-            
-            # Extract web search results
-            for item in data.get('webPages', {}).get('value', []):
-                # Filter for forum posts and repair stories
-                if any(keyword in item.get('url', '').lower() for keyword in ['forum', 'community', 'discussion']):
-                    stories.append({
-                        'title': item.get('name', ''),
-                        'solution': item.get('snippet', ''),
-                        'success': True,
-                        'source': 'Bing Web Search'
-                    })
-            
-            self.logger.info(f"Found {len(stories)} repair stories for query: {query}")
-            return stories
-            
-        except Exception as e:
+        except (aiohttp.ClientError, asyncio.TimeoutError, orjson.JSONDecodeError) as e:
             self.logger.error(f"Error searching for repair stories: {str(e)}")
-            return [] 
\ No newline at end of file
+            return []
+
+    async def _fetch_repair_stories(self, query: str, enhanced_query: str) -> List[Dict]:
+        """Request repair stories from Bing and parse the results."""
+        items = await self._web_search(enhanced_query, _STORY_COUNT)
+        
+        # Extract web search results. Bing already filtered by URL; this keeps
+        # out any result that slipped past the inurl: operators
+        get = dict.get
+        is_story_url = _STORY_URL_RE.search
+        stories = [
+            {
+                'title': get(item, 'name', ''),
+                'solution': get(item, 'snippet', ''),
+                'success': True,
+                'source': _SOURCE
+            }
+            for item in items
+            if is_story_url(get(item, 'url', ''))
+        ]
+        
+        self.logger.info("Found %d repair stories for query: %s", len(stories), query)
+        return stories
+
+    async def _web_search(self, query: str, count: int) -> List[Dict]:
+        """Call the Bing Web Search API and return its web page items."""
+        params = {'q': query, 'count': count, **_SEARCH_PARAMS}
+        
+        # Serve fresh responses from the disk cache, and revalidate stale ones
+        cached = None
+        headers = {}
+        if self._disk_cache is not None:
+            key = make_key('GET', self.base_url, sorted(params.items()), self.subscription_key)
+            cached = self._disk_cache.get(key)
+            if cached is not None:
+                if self._disk_cache.is_fresh(cached):
+                    return orjson.loads(cached.body).get('webPages', {}).get('value', [])
+                if cached.etag:
+                    headers['If-None-Match'] = cached.etag
+        
+        # Make the request and parse the response; the client encodes the query string
+        async with self.client.request('GET', self.base_url, params=params, headers=headers) as response:
+            if response.status == 304 and cached is not None:
+                body = cached.body
+            else:
+                response.raise_for_status()
+                body = await response.read()
+            etag = response.headers.get('ETag')
+        
+        if self._disk_cache is not None:
+            self._disk_cache.set(key, body, etag or (cached.etag if cached else None))
+        
+        data = orjson.loads(body)
+        return data.get('webPages', {}).get('value', [])
+
+    async def close(self):
+        """Close pooled HTTP connections."""
+        await self.client.close()
\ No newline at end of file
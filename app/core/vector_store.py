@@ -1,23 +1,100 @@
+import asyncio
 import faiss
 import numpy as np
+import orjson
+import torch
 from sentence_transformers import SentenceTransformer
-from typing import List, Dict, Optional
-import json
+from typing import List, Dict, Optional, Tuple
+from collections import defaultdict
+import hashlib
+import logging
+import math
 import os
+import re
 from pathlib import Path
 from dotenv import load_dotenv
+from app.services.batcher import MicroBatcher
+from app.utils.cache import TTLCache
 
 # Load environment variables
 load_dotenv(os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'config', '.env'))
 
+# Small catalogues are searched exactly with a flat index. Larger ones use an
+# HNSW graph, which visits roughly M·log N vectors per query instead of all N,
+# over vectors stored as 8-bit scalars for a quarter of the memory
+_HNSW_MIN_PRODUCTS = 10000
+_HNSW_M = 32
+_HNSW_EF_CONSTRUCTION = 200
+_HNSW_EF_SEARCH = 64
+
+# HNSW keeps every full vector plus its graph links in memory; past this size
+# IVF-PQ's compressed codes keep memory bounded instead
+_IVFPQ_MIN_PRODUCTS = 1000000
+_IVFPQ_MAX_LISTS = 1024
+_IVFPQ_SUBQUANTIZERS = 16
+_IVFPQ_BITS = 8
+_IVFPQ_NPROBE = 16
+
+# Searches arriving within this window are encoded and searched together
+_SEARCH_BATCH_SIZE = 32
+_SEARCH_BATCH_DELAY = 0.01
+
+# Products added at runtime are encoded this many at a time
+_ADD_BATCH_SIZE = 32
+
+# Query embeddings only depend on the text, so they are kept for an hour
+_QUERY_CACHE_SIZE = 1024
+_QUERY_CACHE_TTL = 3600
+
+# Part numbers look like PS12345678
+_PART_NO_RE = re.compile(r'PS\d{8}', re.IGNORECASE)
+
+# Prompt layout of a search result; missing product fields read N/A
+_PRODUCT_TEMPLATE = (
+    "Part Number: {part_number}\n"
+    "Name: {name}\n"
+    "Compatible Models: {model_compatibility}\n"
+    "Installation Guide: {installation_guide}\n"
+    "Product URL: {product_url}\n"
+    "Installation Video: {part_video}\n"
+)
+_STORY_TEMPLATE = "- {title}\n  Symptoms: {symptoms}\n  Solution: {solution}"
+
+def _format_product(product: Dict) -> str:
+    """Format one product, followed by its repair stories if it has any."""
+    text = _PRODUCT_TEMPLATE.format_map(defaultdict(lambda: 'N/A', product))
+    if product.get('repair_stories'):
+        stories = "\n".join(_STORY_TEMPLATE.format_map(story) for story in product['repair_stories'])
+        text = f"{text}\nRepair Stories:\n{stories}"
+    return text
+
 class VectorStore:
     def __init__(self):
-        # Initialize the sentence transformer model
-        self.encoder = SentenceTransformer('all-MiniLM-L6-v2')
+        self.logger = logging.getLogger(__name__)
+        
+        # Initialize the sentence transformer model. An int8 ONNX export runs
+        # several times faster on CPU; it is imported only when configured so
+        # onnxruntime stays optional
+        self.encoder = None
+        onnx_dir = os.getenv('ENCODER_ONNX_DIR')
+        if onnx_dir:
+            try:
+                from app.core.onnx_encoder import OnnxEncoder
+            except ImportError as e:
+                self.logger.error(f"ENCODER_ONNX_DIR is set but the ONNX encoder cannot be imported ({str(e)}); "
+                                  "falling back to SentenceTransformer")
+            else:
+                self.encoder = OnnxEncoder(onnx_dir)
+        if self.encoder is None:
+            # Half precision doubles GPU throughput with no visible effect on similarity
+            device = 'cuda' if torch.cuda.is_available() else 'cpu'
+            self.encoder = SentenceTransformer('all-MiniLM-L6-v2', device=device)
+            if device == 'cuda':
+                self.encoder.half()
         
         # Initialize FAISS index
         self.dimension = 384  # Dimension of the sentence transformer embeddings
-        self.index = faiss.IndexFlatL2(self.dimension)
+        self.index = self._to_gpu(faiss.IndexFlatIP(self.dimension))
         
         # Store for product information
         self.products: List[Dict] = []
@@ -25,6 +102,21 @@ class VectorStore:
         # Create part number index
         self.part_number_index: Dict[str, Dict] = {}
         
+        # Search result text of each product, parallel to self.products
+        self._formatted: List[str] = []
+        
+        # Texts of added products not yet in the index, in product order
+        self._pending_texts: List[str] = []
+        
+        # Embeddings of recent queries; popular questions skip the encoder
+        self._query_cache = TTLCache(maxsize=_QUERY_CACHE_SIZE, ttl=_QUERY_CACHE_TTL)
+        
+        # Serializes encoder and index use across worker threads
+        self._index_lock = asyncio.Lock()
+        
+        # Coalesce concurrent searches
+        self._search_batcher = MicroBatcher(self._search_many, max_batch_size=_SEARCH_BATCH_SIZE, max_delay=_SEARCH_BATCH_DELAY)
+        
         # Load product data
         self._load_product_data()
         
@@ -32,27 +124,111 @@ class VectorStore:
         """Load product data from JSON file and create embeddings."""
         try:
             data_file_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'data', 'product_data.json')
-            with open(data_file_path, 'r') as f:
-                data = json.load(f)
+            with open(data_file_path, 'rb') as f:
+                raw = f.read()
+                data = orjson.loads(raw)
                 self.products = data.get('products', [])
                 
             # Create part number index
-            for product in self.products:
-                if 'part_number' in product:
-                    self.part_number_index[product['part_number']] = product
+            self.part_number_index = {
+                product['part_number']: product
+                for product in self.products if 'part_number' in product
+            }
+            
+            # Products rarely change, so their prompt text is formatted once
+            self._formatted = [_format_product(product) for product in self.products]
+                
+            # Reuse the index saved for this exact catalogue, if any
+            index_path = self._index_cache_path(raw)
+            index = self._read_cached_index(index_path) if index_path else None
+            
+            if index is None:
+                # Create embeddings for all products
+                texts = [self._create_product_text(product) for product in self.products]
+                embeddings = self._encode(texts)
                 
-            # Create embeddings for all products
-            texts = [self._create_product_text(product) for product in self.products]
-            embeddings = self.encoder.encode(texts)
+                # Build the FAISS index
+                index = self._build_index(embeddings)
+                if index_path:
+                    self._write_cached_index(index, index_path)
             
-            # Add to FAISS index
-            self.index.add(np.array(embeddings).astype('float32'))
+            self.index = self._to_gpu(index)
             
         except FileNotFoundError:
             print("Product data file not found. Vector store initialized empty.")
-        except json.JSONDecodeError:
+        except orjson.JSONDecodeError:
             print("Error decoding product data file. Vector store initialized empty.")
     
+    def _build_index(self, embeddings: np.ndarray) -> faiss.Index:
+        """Build a FAISS index sized to the number of embeddings."""
+        num_vectors = len(embeddings)
+        if num_vectors < _HNSW_MIN_PRODUCTS:
+            index = faiss.IndexFlatIP(self.dimension)
+        elif num_vectors < _IVFPQ_MIN_PRODUCTS:
+            index = faiss.IndexHNSWSQ(self.dimension, faiss.ScalarQuantizer.QT_8bit, _HNSW_M,
+                                      faiss.METRIC_INNER_PRODUCT)
+            index.hnsw.efConstruction = _HNSW_EF_CONSTRUCTION
+            index.hnsw.efSearch = _HNSW_EF_SEARCH
+            index.train(embeddings)
+        else:
+            nlist = min(_IVFPQ_MAX_LISTS, int(math.sqrt(num_vectors)))
+            quantizer = faiss.IndexFlatIP(self.dimension)
+            index = faiss.IndexIVFPQ(quantizer, self.dimension, nlist, _IVFPQ_SUBQUANTIZERS, _IVFPQ_BITS,
+                                     faiss.METRIC_INNER_PRODUCT)
+            index.train(embeddings)
+            index.nprobe = _IVFPQ_NPROBE
+        
+        index.add(embeddings)
+        return index
+    
+    def _index_cache_path(self, catalogue: bytes) -> Optional[Path]:
+        """Path of the saved index for this catalogue and encoder, if index caching is enabled."""
+        cache_dir = os.getenv('VECTOR_INDEX_CACHE_DIR')
+        if not cache_dir:
+            return None
+        
+        # Any change to the catalogue or the encoder backend gives a new file
+        digest = hashlib.blake2b(catalogue, digest_size=16)
+        digest.update(type(self.encoder).__name__.encode())
+        return Path(cache_dir) / f"index_{digest.hexdigest()}.faiss"
+    
+    def _read_cached_index(self, path: Path) -> Optional[faiss.Index]:
+        """Load a saved index, or return None if there is no usable one."""
+        if not path.exists():
+            return None
+        try:
+            index = faiss.read_index(str(path))
+        except RuntimeError as e:
+            print(f"Error reading cached index {path}: {str(e)}")
+            return None
+        return index if index.ntotal == len(self.products) else None
+    
+    def _write_cached_index(self, index: faiss.Index, path: Path):
+        """Save a CPU index atomically and remove indexes saved for older catalogues."""
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+            faiss.write_index(index, str(tmp_path))
+            os.replace(tmp_path, path)
+            for stale in path.parent.glob("index_*.faiss"):
+                if stale != path:
+                    stale.unlink(missing_ok=True)
+        except (OSError, RuntimeError) as e:
+            print(f"Error writing cached index {path}: {str(e)}")
+    
+    def _to_gpu(self, index: faiss.Index) -> faiss.Index:
+        """Move flat and IVF indexes onto all GPUs when any are available."""
+        # FAISS has no GPU implementation of HNSW, so graph indexes stay on CPU
+        if faiss.get_num_gpus() == 0 or isinstance(index, faiss.IndexHNSW):
+            return index
+        return faiss.index_cpu_to_all_gpus(index)
+    
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        """Encode texts as unit-length float32 vectors, so inner product is cosine similarity."""
+        embeddings = self.encoder.encode(texts, normalize_embeddings=True, convert_to_numpy=True)
+        # FAISS needs float32; only a half-precision encoder makes this copy
+        return embeddings.astype(np.float32, copy=False)
+    
     def _create_product_text(self, product: Dict) -> str:
         """Create a searchable text representation of a product."""
         return f"{product.get('name', '')} {product.get('description', '')} {product.get('model_compatibility', '')} {product.get('part_number', '')}"
@@ -61,35 +237,57 @@ class VectorStore:
         """Search for relevant product information based on the query."""
         if not self.products:
             return None
-            
-        # Encode the query
-        query_vector = self.encoder.encode([query])
-        
-        # Search in FAISS
-        distances, indices = self.index.search(np.array(query_vector).astype('float32'), k)
-        
-        # Format results
-        results = []
-        for idx in indices[0]:
-            if idx < len(self.products):
-                product = self.products[idx]
-                results.append(
-                    f"Part Number: {product.get('part_number', 'N/A')}\n"
-                    f"Name: {product.get('name', 'N/A')}\n"
-                    f"Compatible Models: {product.get('model_compatibility', 'N/A')}\n"
-                    f"Installation Guide: {product.get('installation_guide', 'N/A')}\n"
-                    f"Product URL: {product.get('product_url', 'N/A')}\n"
-                    f"Installation Video: {product.get('part_video', 'N/A')}\n"
-                )
-                
-                # Add repair stories if available
-                if product.get('repair_stories'):
-                    results.append("Repair Stories:")
-                    for story in product['repair_stories']:
-                        results.append(f"- {story['title']}")
-                        results.append(f"  Symptoms: {story['symptoms']}")
-                        results.append(f"  Solution: {story['solution']}")
         
+        # A known part number answers the query exactly, without encoding it
+        match = _PART_NO_RE.search(query)
+        if match:
+            product = self.part_number_index.get(match.group().upper())
+            if product is not None:
+                return _format_product(product)
+        
+        # Concurrent searches share one encoder pass and one FAISS search
+        return await self._search_batcher.submit((query, k))
+    
+    async def _search_many(self, requests: List[Tuple[str, int]]) -> List[Optional[str]]:
+        """Run a batch of (query, k) searches with a single encode and FAISS search."""
+        # Encoding and searching block for milliseconds, so they run on a worker
+        # thread; the lock keeps the encoder and index to one thread at a time
+        async with self._index_lock:
+            return await asyncio.to_thread(self._search_many_sync, requests)
+    
+    def _search_many_sync(self, requests: List[Tuple[str, int]]) -> List[Optional[str]]:
+        """Blocking part of _search_many."""
+        # Make products added since the last search findable
+        self.flush()
+        
+        queries = [query for query, _ in requests]
+        max_k = max(k for _, k in requests)
+        
+        # Encode the queries not seen recently
+        query_vectors = self._embed_queries(queries)
+        
+        # Search in FAISS; each request takes the top k of the shared max_k results
+        scores, indices = self.index.search(query_vectors, max_k)
+        
+        return [self._format_results(row[:k]) for row, (_, k) in zip(indices, requests)]
+    
+    def _embed_queries(self, queries: List[str]) -> np.ndarray:
+        """Embed queries, encoding only those missing from the query cache."""
+        vectors = {query: self._query_cache.get(query) for query in queries}
+        misses = [query for query, vector in vectors.items() if vector is None]
+        if misses:
+            for query, vector in zip(misses, self._encode(misses)):
+                vector = vector.copy()  # Don't keep the whole batch alive
+                vector.flags.writeable = False
+                self._query_cache.set(query, vector)
+                vectors[query] = vector
+        return np.stack([vectors[query] for query in queries])
+    
+    def _format_results(self, indices: np.ndarray) -> Optional[str]:
+        """Format the products at the given index positions for the prompt."""
+        formatted = self._formatted
+        # FAISS pads missing results with -1
+        results = [formatted[idx] for idx in indices if 0 <= idx < len(formatted)]
         return "\n".join(results) if results else None
     
     async def get_product_by_part_number(self, part_number: str) -> Optional[Dict]:
@@ -99,18 +297,27 @@ class VectorStore:
     async def add_product(self, product: Dict):
         """Add a new product to the vector store."""
         self.products.append(product)
+        self._formatted.append(_format_product(product))
         
         # Update part number index
         if 'part_number' in product:
             self.part_number_index[product['part_number']] = product
         
-        # Create and add embedding
-        text = self._create_product_text(product)
-        embedding = self.encoder.encode([text])
-        self.index.add(np.array(embedding).astype('float32'))
+        # Embeddings are added in batches; searches flush any still pending
+        self._pending_texts.append(self._create_product_text(product))
+        if len(self._pending_texts) >= _ADD_BATCH_SIZE:
+            async with self._index_lock:
+                await asyncio.to_thread(self.flush)
+    
+    def flush(self):
+        """Encode and index products added since the last flush."""
+        # Take the pending texts first, so products added meanwhile wait for the next flush
+        texts, self._pending_texts = self._pending_texts, []
+        if texts:
+            self.index.add(self._encode(texts))
     
     def save_products(self):
         """Save product data to file."""
         data_file_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'data', 'product_data.json')
-        with open(data_file_path, 'w') as f:
-            json.dump({"products": self.products}, f) 
\ No newline at end of file
+        with open(data_file_path, 'wb') as f:
+            f.write(orjson.dumps({"products": self.products})) 
\ No newline at end of file
@@ -0,0 +1,77 @@
+"""
+This module implements micro-batching of concurrent requests.
+Requests are collected for a short window and handed to a batch handler together.
+"""
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, List, Optional, Set, Tuple
+
+# Handler receiving a batch of requests and returning one result per request.
+# A result may be an exception instance, which is raised to that request's caller only.
+BatchHandler = Callable[[List[Any]], Awaitable[List[Any]]]
+
+class MicroBatcher:
+    def __init__(self, handler: BatchHandler, max_batch_size: int = 16, max_delay: float = 0.05):
+        self.logger = logging.getLogger(__name__)
+        self.handler = handler
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._in_flight: Set[asyncio.Task] = set()  # Keeps dispatched batches referenced
+
+    async def submit(self, request: Any) -> Any:
+        """
+        Queue a request and wait for its result.
+
+        Args:
+            request: Request to pass to the handler
+
+        Returns:
+            The handler's result for this request
+        """
+        # Start the collector lazily so it runs on the serving event loop
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._collect())
+
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((request, future))
+        return await future
+
+    async def _collect(self):
+        """Gather requests into batches and dispatch them without waiting for completion."""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_delay
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            # Dispatch in the background so the next batch can start filling
+            task = asyncio.create_task(self._dispatch(batch))
+            self._in_flight.add(task)
+            task.add_done_callback(self._in_flight.discard)
+
+    async def _dispatch(self, batch: List[Tuple[Any, asyncio.Future]]):
+        """Run the handler for one batch and resolve each caller's future."""
+        self.logger.debug(f"Dispatching batch of {len(batch)}")
+        try:
+            results = await self.handler([request for request, _ in batch])
+        except Exception as e:
+            results = [e] * len(batch)
+
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
@@ -0,0 +1,65 @@
+"""
+Test module for the request micro-batcher.
+"""
+
+import asyncio
+import logging
+from app.services.batcher import MicroBatcher
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def test_concurrent_requests_share_a_batch():
+    """Test that concurrent submissions are dispatched together."""
+    batches = []
+
+    async def handler(requests):
+        batches.append(list(requests))
+        return [f"reply to {request}" for request in requests]
+
+    async def run():
+        batcher = MicroBatcher(handler, max_batch_size=8, max_delay=0.05)
+        return await asyncio.gather(*(batcher.submit(f"question {i}") for i in range(5)))
+
+    replies = asyncio.run(run())
+    assert replies == [f"reply to question {i}" for i in range(5)]
+    assert len(batches) == 1
+
+def test_batch_size_limit():
+    """Test that batches never exceed the configured size."""
+    batches = []
+
+    async def handler(requests):
+        batches.append(len(requests))
+        return requests
+
+    async def run():
+        batcher = MicroBatcher(handler, max_batch_size=3, max_delay=0.05)
+        return await asyncio.gather(*(batcher.submit(i) for i in range(7)))
+
+    assert asyncio.run(run()) == list(range(7))
+    assert max(batches) <= 3
+
+def test_errors_are_raised_per_request():
+    """Test that a failed request only fails its own caller."""
+    async def handler(requests):
+        return [ValueError("bad") if request == "fail" else "ok" for request in requests]
+
+    async def run():
+        batcher = MicroBatcher(handler)
+        return await asyncio.gather(batcher.submit("fine"), batcher.submit("fail"), return_exceptions=True)
+
+    ok, failed = asyncio.run(run())
+    assert ok == "ok"
+    assert isinstance(failed, ValueError)
+
+if __name__ == "__main__":
+    logger.info("Testing batching of concurrent requests...")
+    test_concurrent_requests_share_a_batch()
+
+    logger.info("\nTesting batch size limit...")
+    test_batch_size_limit()
+
+    logger.info("\nTesting per-request errors...")
+    test_errors_are_raised_per_request()
@@ -0,0 +1,154 @@
+"""
+Test module for the TTL+LRU cache.
+"""
+
+import asyncio
+import logging
+import time
+from app.utils.cache import InFlight, TTLCache, make_key
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def test_expiry_and_eviction():
+    """Test that entries expire after the TTL and the least recently used is evicted."""
+    cache = TTLCache(maxsize=2, ttl=0.05)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+
+    time.sleep(0.06)
+    assert cache.get("a") is None
+    assert len(cache) == 1
+
+def test_concurrent_misses_share_one_fetch():
+    """Test that identical concurrent lookups trigger a single fetch."""
+    cache = TTLCache()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return ["result"]
+
+    async def run():
+        key = make_key("search_repair_info", "ice maker", 5)
+        results = await asyncio.gather(*(cache.get_or_fetch(key, fetch) for _ in range(5)))
+        results.append(await cache.get_or_fetch(key, fetch))
+        return results
+
+    assert asyncio.run(run()) == [["result"]] * 6
+    assert len(calls) == 1
+
+def test_failures_are_not_cached():
+    """Test that a failed fetch reaches every waiter and is retried next time."""
+    cache = TTLCache()
+    attempts = []
+
+    async def fetch():
+        attempts.append(1)
+        await asyncio.sleep(0.01)
+        if len(attempts) == 1:
+            raise RuntimeError("upstream error")
+        return "ok"
+
+    async def run():
+        results = await asyncio.gather(*(cache.get_or_fetch("key", fetch) for _ in range(3)), return_exceptions=True)
+        assert all(isinstance(result, RuntimeError) for result in results)
+        return await cache.get_or_fetch("key", fetch)
+
+    assert asyncio.run(run()) == "ok"
+    assert len(attempts) == 2
+
+def test_in_flight_calls_are_not_kept():
+    """Test that calls are shared only while running."""
+    in_flight = InFlight()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return len(calls)
+
+    async def run():
+        shared = await asyncio.gather(*(in_flight.run("key", fetch) for _ in range(4)))
+        return shared, await in_flight.run("key", fetch)
+
+    shared, later = asyncio.run(run())
+    assert shared == [1, 1, 1, 1]
+    assert later == 2
+    assert len(in_flight) == 0
+
+def test_cancelled_caller_does_not_cancel_others():
+    """Test that cancelling the caller that started a call leaves the others waiting for it."""
+    in_flight = InFlight()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.02)
+        return "result"
+
+    async def run():
+        leader = asyncio.create_task(in_flight.run("key", fetch))
+        await asyncio.sleep(0)
+        followers = [asyncio.create_task(in_flight.run("key", fetch)) for _ in range(2)]
+        await asyncio.sleep(0.005)
+        leader.cancel()
+        results = await asyncio.gather(*followers)
+        return leader.cancelled(), results
+
+    leader_cancelled, results = asyncio.run(run())
+    assert leader_cancelled
+    assert results == ["result", "result"]
+    assert len(calls) == 1
+    assert len(in_flight) == 0
+
+def test_call_cancelled_when_all_callers_leave():
+    """Test that the shared call stops once every caller is cancelled, and the next caller starts afresh."""
+    in_flight = InFlight()
+    cancelled = []
+
+    async def fetch():
+        try:
+            await asyncio.sleep(1)
+        except asyncio.CancelledError:
+            cancelled.append(1)
+            raise
+        return "stale"
+
+    async def fresh():
+        return "fresh"
+
+    async def run():
+        callers = [asyncio.create_task(in_flight.run("key", fetch)) for _ in range(2)]
+        await asyncio.sleep(0.005)
+        for caller in callers:
+            caller.cancel()
+        await asyncio.gather(*callers, return_exceptions=True)
+        return await in_flight.run("key", fresh)
+
+    assert asyncio.run(run()) == "fresh"
+    assert cancelled == [1]
+    assert len(in_flight) == 0
+
+if __name__ == "__main__":
+    logger.info("Testing expiry and eviction...")
+    test_expiry_and_eviction()
+
+    logger.info("\nTesting shared fetches...")
+    test_concurrent_misses_share_one_fetch()
+
+    logger.info("\nTesting failed fetches...")
+    test_failures_are_not_cached()
+
+    logger.info("\nTesting in-flight calls...")
+    test_in_flight_calls_are_not_kept()
+
+    logger.info("\nTesting cancelled callers...")
+    test_cancelled_caller_does_not_cancel_others()
+    test_call_cancelled_when_all_callers_leave()
@@ -0,0 +1,83 @@
+"""
+Test module for routing cart commands in the chat endpoint.
+Explicit commands change the cart directly; anything ambiguous goes to the LLM.
+"""
+
+import logging
+import pytest
+from fastapi.testclient import TestClient
+from app.api import main
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+client = TestClient(main.app)
+
+_USER_ID = "cart-command-test"
+_PART_NUMBER = "PS11752778"
+
+@pytest.fixture
+def llm_calls(monkeypatch):
+    """Replace the LLM with a canned reply and record the conversations sent to it."""
+    calls = []
+
+    async def generate_response(messages):
+        calls.append(messages)
+        return "LLM reply"
+
+    monkeypatch.setattr(main.chat_agent, "generate_response", generate_response)
+    main.cart_manager.clear_cart(_USER_ID)
+    yield calls
+    main.cart_manager.clear_cart(_USER_ID)
+
+def _chat(content: str) -> str:
+    response = client.post(
+        "/api/chat",
+        json={"messages": [{"role": "user", "content": content}], "user_id": _USER_ID}
+    )
+    assert response.status_code == 200
+    return response.json()["message"]["content"]
+
+def _quantity() -> int:
+    item = main.cart_manager.get_item(_PART_NUMBER, user_id=_USER_ID)
+    return item.quantity if item else 0
+
+def test_add_command(llm_calls):
+    """Test that an explicit add command changes the cart without the LLM."""
+    _chat(f"add {_PART_NUMBER} to my cart")
+    assert _quantity() == 1
+    assert not llm_calls
+
+def test_remove_command_mentioning_added(llm_calls):
+    """Test that "added" in a remove command doesn't turn it into an add."""
+    main.cart_manager.add_to_cart(_PART_NUMBER, "Refrigerator Door Shelf Bin", 36.08, user_id=_USER_ID)
+
+    _chat(f"Please remove {_PART_NUMBER} from my cart, I added it by mistake")
+    assert _quantity() == 0
+    assert not llm_calls
+
+def test_question_mentioning_address(llm_calls):
+    """Test that a question about the cart goes to the LLM and leaves the cart alone."""
+    reply = _chat(f"what's the shipping address for {_PART_NUMBER} in my cart?")
+    assert reply == "LLM reply"
+    assert _quantity() == 0
+    assert len(llm_calls) == 1
+
+def test_statement_mentioning_added(llm_calls):
+    """Test that "added" alone is not an add command."""
+    reply = _chat(f"I added {_PART_NUMBER} to my cart yesterday")
+    assert reply == "LLM reply"
+    assert _quantity() == 0
+
+def test_both_verbs(llm_calls):
+    """Test that a message naming both add and remove goes to the LLM."""
+    main.cart_manager.add_to_cart(_PART_NUMBER, "Refrigerator Door Shelf Bin", 36.08, user_id=_USER_ID)
+
+    reply = _chat(f"add {_PART_NUMBER} to my cart and remove PS11746285")
+    assert reply == "LLM reply"
+    assert _quantity() == 1
+
+if __name__ == "__main__":
+    logger.info("Testing Cart Command Routing...")
+    pytest.main(["-v", __file__])
@@ -0,0 +1,132 @@
+"""
+Test module for the cart manager implementation.
+"""
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from app.core.cart_manager import CartManager
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def test_add_to_cart():
+    """Test adding new items and increasing quantity of existing ones."""
+    cart_manager = CartManager()
+
+    assert cart_manager.add_to_cart("PS11752778", "Refrigerator Door Shelf Bin", 36.08)
+    assert cart_manager.add_to_cart("PS11752778", "Refrigerator Door Shelf Bin", 36.08, quantity=2)
+    assert cart_manager.add_to_cart("PS11746285", "Refrigerator Water Filter", 49.99)
+
+    items = cart_manager.get_cart()
+    assert [item.part_number for item in items] == ["PS11752778", "PS11746285"]
+    assert items[0].quantity == 3
+    assert items[1].quantity == 1
+
+def test_remove_from_cart():
+    """Test removing items, including ones not in the cart."""
+    cart_manager = CartManager()
+    cart_manager.add_to_cart("PS11752778", "Refrigerator Door Shelf Bin", 36.08)
+
+    assert cart_manager.remove_from_cart("PS11752778")
+    assert cart_manager.remove_from_cart("PS00000000")
+    assert cart_manager.get_cart() == []
+
+def test_get_item():
+    """Test looking up a single item by part number."""
+    cart_manager = CartManager()
+    cart_manager.add_to_cart("PS11752778", "Refrigerator Door Shelf Bin", 36.08, quantity=2)
+
+    item = cart_manager.get_item("PS11752778")
+    assert item.name == "Refrigerator Door Shelf Bin"
+    assert item.quantity == 2
+    assert cart_manager.get_item("PS00000000") is None
+    assert cart_manager.get_item("PS11752778", user_id="someone_else") is None
+
+def test_cart_total():
+    """Test the cart total across adds, removes and clears."""
+    cart_manager = CartManager()
+    cart_manager.add_to_cart("PS11752778", "Refrigerator Door Shelf Bin", 36.08, quantity=2)
+    cart_manager.add_to_cart("PS11746285", "Refrigerator Water Filter", 49.99)
+    assert abs(cart_manager.get_cart_total() - 122.15) < 1e-9
+
+    cart_manager.remove_from_cart("PS11746285")
+    assert abs(cart_manager.get_cart_total() - 72.16) < 1e-9
+
+    assert cart_manager.clear_cart()
+    assert cart_manager.get_cart_total() == 0
+
+def test_per_user_carts():
+    """Test that carts are kept separate per user and grow past one chunk."""
+    cart_manager = CartManager()
+    for i in range(20):
+        cart_manager.add_to_cart(f"PS{i:08d}", f"Part {i}", 1.0, user_id="alice")
+    cart_manager.add_to_cart("PS11752778", "Refrigerator Door Shelf Bin", 36.08, user_id="bob")
+
+    cart_manager.remove_from_cart("PS00000003", user_id="alice")
+    assert len(cart_manager.get_cart("alice")) == 19
+    assert cart_manager.get_cart("alice")[3].part_number == "PS00000004"
+    assert cart_manager.get_cart() == []
+
+    totals = cart_manager.get_all_cart_totals()
+    assert totals["alice"] == 19.0
+    assert abs(totals["bob"] - 36.08) < 1e-9
+
+def test_remove_keeps_order():
+    """Test that removals keep the cart in order, before and after compaction."""
+    cart_manager = CartManager()
+    for i in range(10):
+        cart_manager.add_to_cart(f"PS{i:08d}", f"Part {i}", float(i))
+
+    cart_manager.remove_from_cart("PS00000002")
+    cart_manager.remove_from_cart("PS00000005")
+    assert [item.part_number for item in cart_manager.get_cart()] == [
+        f"PS{i:08d}" for i in (0, 1, 3, 4, 6, 7, 8, 9)
+    ]
+    assert cart_manager.get_item("PS00000006").price == 6.0
+
+    # Removing half the rows compacts the cart
+    for i in (0, 1, 7):
+        cart_manager.remove_from_cart(f"PS{i:08d}")
+    cart_manager.add_to_cart("PS00000001", "Part 1", 1.0, quantity=2)
+    assert len(cart_manager.carts["default"]) == 6
+    assert [item.part_number for item in cart_manager.get_cart()] == [
+        f"PS{i:08d}" for i in (3, 4, 6, 8, 9, 1)
+    ]
+    assert cart_manager.get_item("PS00000009").price == 9.0
+    assert cart_manager.get_cart_total() == 32.0
+
+def test_concurrent_adds():
+    """Test that adds from many threads are not lost."""
+    cart_manager = CartManager()
+
+    def add(i):
+        cart_manager.add_to_cart(f"PS{i % 50:08d}", f"Part {i % 50}", 2.0, user_id=f"user{i % 3}")
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(add, range(3000)))
+
+    assert sum(cart_manager.get_all_cart_totals().values()) == 6000.0
+    assert sum(item.quantity for item in cart_manager.get_cart("user0")) == 1000
+
+if __name__ == "__main__":
+    logger.info("Testing add_to_cart...")
+    test_add_to_cart()
+
+    logger.info("\nTesting remove_from_cart...")
+    test_remove_from_cart()
+
+    logger.info("\nTesting get_item...")
+    test_get_item()
+
+    logger.info("\nTesting get_cart_total...")
+    test_cart_total()
+
+    logger.info("\nTesting per-user carts...")
+    test_per_user_carts()
+
+    logger.info("\nTesting removal order...")
+    test_remove_keeps_order()
+
+    logger.info("\nTesting concurrent adds...")
+    test_concurrent_adds()
@@ -0,0 +1,81 @@
+"""
+Test module for the Deepseek client's retries and circuit breaker.
+The API is replaced by an httpx MockTransport, so no requests leave the process.
+"""
+
+import asyncio
+import logging
+import time
+import httpx
+import pytest
+from app.core import deepseek_client
+from app.core.deepseek_client import DeepSeekClient
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+_MESSAGES = [{"role": "user", "content": "My dishwasher won't drain"}]
+_REPLY = {"choices": [{"message": {"role": "assistant", "content": "Check the drain pump"}}]}
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    """Skip the jittered backoff so only the rate limiter delays retries."""
+    monkeypatch.setattr(deepseek_client.random, "uniform", lambda low, high: 0.0)
+
+def make_client(responses):
+    """Build a client whose API replies with the given responses in turn; returns it and the request times."""
+    responses = iter(responses)
+    request_times = []
+
+    def handler(request):
+        request_times.append(time.monotonic())
+        return next(responses)
+
+    client = DeepSeekClient(api_key="test-key", model="deepseek-chat")
+    client.http = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return client, request_times
+
+def test_retry_honours_retry_after():
+    """Test that 429 and 503 are retried, waiting out Retry-After first."""
+    client, request_times = make_client([
+        httpx.Response(429, headers={"Retry-After": "0.2"}),
+        httpx.Response(503),
+        httpx.Response(200, json=_REPLY)
+    ])
+
+    assert asyncio.run(client.chat(_MESSAGES)) == "Check the drain pump"
+    assert len(request_times) == 3
+    assert request_times[1] - request_times[0] >= 0.2
+    assert client.limiter.concurrency < client.limiter.max_concurrency
+    assert client.limiter._in_flight == 0
+    assert not client.breaker.is_open
+
+def test_breaker_opens_after_failures():
+    """Test that five failed calls open the breaker and the next call is refused without a request."""
+    client, request_times = make_client([httpx.Response(503)] * (5 * deepseek_client._MAX_ATTEMPTS))
+
+    async def call_until_open():
+        for _ in range(5):
+            with pytest.raises(Exception, match="status 503"):
+                await client.chat(_MESSAGES)
+        assert client.breaker.is_open
+        with pytest.raises(Exception, match="Circuit open"):
+            await client.chat(_MESSAGES)
+
+    asyncio.run(call_until_open())
+    assert len(request_times) == 5 * deepseek_client._MAX_ATTEMPTS
+    assert client.limiter._in_flight == 0
+
+def test_client_errors_are_not_retried():
+    """Test that a 4xx other than 429 fails straight away and doesn't count against the breaker."""
+    client, request_times = make_client([httpx.Response(401), httpx.Response(200, json=_REPLY)])
+
+    with pytest.raises(Exception, match="401"):
+        asyncio.run(client.chat(_MESSAGES))
+    assert len(request_times) == 1
+    assert client.breaker._failures == 0
+
+if __name__ == "__main__":
+    logger.info("Testing Deepseek Client...")
+    pytest.main(["-v", __file__])
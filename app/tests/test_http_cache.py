@@ -0,0 +1,33 @@
+"""
+Test module for the on-disk HTTP response cache.
+"""
+
+import logging
+import tempfile
+from app.utils.http_cache import DiskHTTPCache
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def test_store_and_expire():
+    """Test that stored responses round-trip and go stale after the TTL."""
+    with tempfile.TemporaryDirectory() as base_path:
+        cache = DiskHTTPCache(base_path, ttl=60)
+        assert cache.get("missing") is None
+
+        cache.set("key", b'{"webPages": {"value": []}}', '"v1"')
+        entry = cache.get("key")
+        assert entry.body == b'{"webPages": {"value": []}}'
+        assert entry.etag == '"v1"'
+        assert cache.is_fresh(entry)
+
+        # A new instance reads what the previous one wrote
+        stale_cache = DiskHTTPCache(base_path, ttl=0)
+        entry = stale_cache.get("key")
+        assert entry.etag == '"v1"'
+        assert not stale_cache.is_fresh(entry)
+
+if __name__ == "__main__":
+    logger.info("Testing store and expiry...")
+    test_store_and_expire()
@@ -0,0 +1,71 @@
+"""
+Test module for the pooled async HTTP client's retries.
+Requests go to a local aiohttp test server.
+"""
+
+import asyncio
+import logging
+import time
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from app.utils.http_client import AsyncHTTPClient
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+async def run_requests(method: str, statuses, retries: int = 3, backoff_factor: float = 0.05):
+    """Send one request to a server replying with the given statuses in turn; return the final status and request times."""
+    statuses = iter(statuses)
+    request_times = []
+
+    async def handler(request):
+        request_times.append(time.monotonic())
+        return web.Response(status=next(statuses))
+
+    app = web.Application()
+    app.router.add_route("*", "/", handler)
+    client = AsyncHTTPClient({}, concurrency=4, timeout=5, retries=retries, backoff_factor=backoff_factor)
+    async with TestServer(app) as server:
+        try:
+            async with client.request(method, str(server.make_url("/"))) as response:
+                status = response.status
+        finally:
+            await client.close()
+    return status, request_times
+
+def test_idempotent_methods_are_retried():
+    """Test that GET, HEAD and OPTIONS are retried on transient statuses until they succeed."""
+    for method in ("GET", "HEAD", "OPTIONS"):
+        status, request_times = asyncio.run(run_requests(method, [503, 429, 200]))
+        assert status == 200
+        assert len(request_times) == 3
+
+def test_other_methods_are_not_retried():
+    """Test that POST, PUT and DELETE return the first transient status without retrying."""
+    for method in ("POST", "PUT", "DELETE"):
+        status, request_times = asyncio.run(run_requests(method, [503, 200]))
+        assert status == 503
+        assert len(request_times) == 1
+
+def test_backoff_schedule():
+    """Test that retry n waits backoff_factor * 2**n seconds and the last status is returned."""
+    backoff_factor = 0.05
+    status, request_times = asyncio.run(run_requests("GET", [503] * 4, backoff_factor=backoff_factor))
+    assert status == 503
+    assert len(request_times) == 4
+
+    gaps = [later - earlier for earlier, later in zip(request_times, request_times[1:])]
+    for attempt, gap in enumerate(gaps):
+        expected = backoff_factor * 2 ** attempt
+        assert expected <= gap < expected + 0.1
+
+if __name__ == "__main__":
+    logger.info("Testing idempotent retries...")
+    test_idempotent_methods_are_retried()
+
+    logger.info("\nTesting non-idempotent requests...")
+    test_other_methods_are_not_retried()
+
+    logger.info("\nTesting backoff schedule...")
+    test_backoff_schedule()
@@ -0,0 +1,119 @@
+"""
+Test module for the adaptive rate limiter.
+"""
+
+import asyncio
+import logging
+import time
+from app.core.rate_limiter import AIMDLimiter, CircuitBreaker, CircuitOpenError
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def test_aimd_adjustments():
+    """Test that concurrency halves on throttling and grows back on fast successes."""
+    limiter = AIMDLimiter(requests_per_window=100, max_concurrency=8)
+
+    limiter.note(429)
+    assert limiter.concurrency == 4
+    limiter.note(None)
+    assert limiter.concurrency == 2
+
+    limiter.note(200, latency=0.1)
+    assert limiter.concurrency == 2.5
+    limiter.note(200, latency=10.0)
+    assert limiter.concurrency == 2.5
+
+    for _ in range(20):
+        limiter.note(200, latency=0.1)
+    assert limiter.concurrency == 8
+
+def test_sliding_window():
+    """Test that requests beyond the window budget wait for the window to slide."""
+    limiter = AIMDLimiter(requests_per_window=2, window=0.2)
+
+    async def run():
+        start = time.monotonic()
+        for _ in range(3):
+            async with limiter.slot():
+                pass
+        return time.monotonic() - start
+
+    assert asyncio.run(run()) >= 0.2
+
+def test_retry_after_header():
+    """Test that Retry-After blocks new requests."""
+    limiter = AIMDLimiter(requests_per_window=100)
+    limiter.note(429, {'Retry-After': '0.2'})
+
+    async def run():
+        start = time.monotonic()
+        async with limiter.slot():
+            pass
+        return time.monotonic() - start
+
+    assert asyncio.run(run()) >= 0.15
+
+def test_concurrency_cap():
+    """Test that no more requests run at once than the current concurrency."""
+    limiter = AIMDLimiter(requests_per_window=100, max_concurrency=4)
+    limiter.note(503)
+    running = 0
+    peak = 0
+
+    async def request():
+        nonlocal running, peak
+        async with limiter.slot():
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+
+    async def run():
+        await asyncio.gather(*(request() for _ in range(10)))
+
+    asyncio.run(run())
+    assert peak == 2
+
+def test_circuit_breaker():
+    """Test that the breaker opens after consecutive failures and closes on success."""
+    breaker = CircuitBreaker(fail_max=3, reset_timeout=0.1)
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.check()
+
+    breaker.record_failure()
+    try:
+        breaker.check()
+        assert False, "breaker should be open"
+    except CircuitOpenError:
+        pass
+
+    # After the timeout one failure re-opens it, one success closes it
+    time.sleep(0.11)
+    breaker.check()
+    breaker.record_failure()
+    assert breaker.is_open
+    time.sleep(0.11)
+    breaker.record_success()
+    assert not breaker.is_open
+
+if __name__ == "__main__":
+    logger.info("Testing AIMD adjustments...")
+    test_aimd_adjustments()
+
+    logger.info("\nTesting sliding window...")
+    test_sliding_window()
+
+    logger.info("\nTesting Retry-After header...")
+    test_retry_after_header()
+
+    logger.info("\nTesting concurrency cap...")
+    test_concurrency_cap()
+
+    logger.info("\nTesting circuit breaker...")
+    test_circuit_breaker()
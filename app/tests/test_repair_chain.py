@@ -88,6 +88,60 @@ def test_non_repair_issue():
     )
     print_diagnosis_result(result)
 
+def test_diagnosis_cache():
+    """Test that repeated diagnoses are served from the cache."""
+    repair_chain = RepairChain()
+    
+    logger.info("\nTest Case: Repeated Diagnosis")
+    first = repair_chain.diagnose(
+        appliance_type="refrigerator",
+        problem_description="Water is leaking from the bottom of the refrigerator"
+    )
+    second = repair_chain.diagnose(
+        appliance_type="refrigerator",
+        problem_description="Water is leaking from the bottom of the refrigerator"
+    )
+    assert first == second
+    assert first is not second
+    assert repair_chain._diagnose_cached.cache_info().hits == 1
+    
+    repair_chain.cache_clear()
+    assert repair_chain._diagnose_cached.cache_info().currsize == 0
+
+def test_diagnose_many():
+    """Test batch diagnosis against single diagnoses."""
+    repair_chain = RepairChain()
+    queries = [
+        ("refrigerator", "The refrigerator is making a loud grinding noise"),
+        ("dishwasher", "The dishwasher display shows an error code E3"),
+        ("washing machine", "The washing machine is not spinning"),
+        ("refrigerator", "The refrigerator is making a loud grinding noise")
+    ]
+    
+    logger.info("\nTest Case: Batch Diagnosis")
+    results = repair_chain.diagnose_many(queries)
+    assert len(results) == len(queries)
+    for (appliance_type, problem_description), result in zip(queries, results):
+        assert result == repair_chain.diagnose(appliance_type, problem_description)
+    assert results[0] is not results[3]
+    assert results[2]["error"] == "unsupported_appliance"
+
+def test_diagnosis_isolation():
+    """Test that changing a returned diagnosis doesn't affect later diagnoses."""
+    repair_chain = RepairChain()
+    query = ("refrigerator", "The refrigerator is not cooling and needs repair")
+    
+    logger.info("\nTest Case: Modified Diagnosis")
+    first = repair_chain.diagnose(*query)
+    expected = repair_chain.diagnose(*query)
+    first["diagnosis_steps"][0]["possible_causes"].append("Changed by caller")
+    first["diagnosis_steps"][0]["description"] = "Changed by caller"
+    first["safety_notes"].clear()
+    
+    assert repair_chain.diagnose(*query) == expected
+    assert repair_chain.diagnose_many([query])[0] == expected
+    assert RepairChain().diagnose(*query) == expected
+
 def print_diagnosis_result(result: dict):
     """Print the diagnosis result in a formatted way."""
     # Check if this is an error result
@@ -138,4 +192,13 @@ if __name__ == "__main__":
     test_unsupported_appliance()
     
     logger.info("\nTesting Non-Repair Issue...")
-    test_non_repair_issue() 
\ No newline at end of file
+    test_non_repair_issue()
+    
+    logger.info("\nTesting Diagnosis Cache...")
+    test_diagnosis_cache()
+    
+    logger.info("\nTesting Batch Diagnosis...")
+    test_diagnose_many()
+    
+    logger.info("\nTesting Diagnosis Isolation...")
+    test_diagnosis_isolation() 
\ No newline at end of file
@@ -2,7 +2,13 @@
 Test module for the search engine implementation.
 """
 
+import asyncio
 import logging
+import os
+
+# Reuse recorded Bing responses across runs instead of spending quota each time
+os.environ.setdefault("BING_CACHE_DIR", os.path.join(os.path.dirname(__file__), ".http_cache"))
+
 from search_engine import SearchEngine
 
 # Configure logging
@@ -15,7 +21,7 @@ def test_search_repair_info():
     
     # Test with a common appliance
     query = "Samsung washing machine not spinning"
-    results = search_engine.search_repair_info(query)
+    results = asyncio.run(search_engine.search_repair_info(query))
     
     logger.info(f"Search results for '{query}':")
     for result in results:
@@ -31,7 +37,7 @@ def test_search_repair_stories():
     
     # Test with a common appliance
     query = "LG refrigerator not cooling"
-    stories = search_engine.search_repair_stories(query)
+    stories = asyncio.run(search_engine.search_repair_stories(query))
     
     logger.info(f"Repair stories for '{query}':")
     for story in stories:
@@ -0,0 +1,60 @@
+"""
+Test module for the requests the search engine sends to Bing.
+Bing is replaced by canned results, so no API quota is used.
+"""
+
+import asyncio
+import logging
+import os
+import pytest
+
+os.environ.setdefault("BING_SEARCH_KEY", "test-key")
+
+from app.core.search_engine import SearchEngine
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Canned Bing results per appliance; both share the "repair fix solution" wording
+_RESULTS = {
+    "whirlpool": [{"name": "Whirlpool ice maker repair", "snippet": "Fix the ice maker", "url": "https://forum.example.com/whirlpool"}],
+    "bosch": [{"name": "Bosch dishwasher not draining", "snippet": "Repair fix solution", "url": "https://community.example.com/bosch"}],
+}
+
+@pytest.fixture
+def bing_calls(monkeypatch):
+    """Replace Bing with canned results and record the (query, count) of each call."""
+    search_engine = SearchEngine()
+    calls = []
+
+    async def web_search(query, count):
+        calls.append((query, count))
+        return next(items for brand, items in _RESULTS.items() if brand in query)
+
+    monkeypatch.setattr(search_engine, "_web_search", web_search)
+    return search_engine, calls
+
+def test_concurrent_searches_are_sent_separately(bing_calls):
+    """Test that concurrent searches each get their own request and only their own results."""
+    search_engine, calls = bing_calls
+
+    async def search():
+        return await asyncio.gather(
+            search_engine.search_repair_info("whirlpool ice maker", max_results=3),
+            search_engine.search_repair_stories("bosch dishwasher")
+        )
+
+    info, stories = asyncio.run(search())
+
+    assert [result["title"] for result in info] == ["Whirlpool ice maker repair"]
+    assert [story["title"] for story in stories] == ["Bosch dishwasher not draining"]
+    assert len(calls) == 2
+    (story_query, story_count), (info_query, info_count) = sorted(calls)
+    assert info_query == "whirlpool ice maker repair guide fix solution" and info_count == 3
+    assert story_query.startswith("bosch dishwasher repair story") and "whirlpool" not in story_query
+    assert story_count == 5
+
+if __name__ == "__main__":
+    logger.info("Testing Bing Requests...")
+    pytest.main(["-v", __file__])
@@ -0,0 +1,130 @@
+"""
+This module provides an in-process TTL+LRU cache for async lookups, and
+coalescing of identical concurrent calls.
+"""
+
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+def make_key(*parts: Any) -> str:
+    """Build a compact cache key from the given parts."""
+    # repr keeps the boundaries between parts unambiguous
+    return hashlib.blake2b(repr(parts).encode(), digest_size=16).hexdigest()
+
+class TTLCache:
+    def __init__(self, maxsize: int = 1024, ttl: float = 300.0):
+        """
+        Args:
+            maxsize: Maximum number of entries before the least recently used is evicted
+            ttl: Seconds an entry stays valid
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()  # key -> (expires_at, value)
+        self._in_flight = InFlight()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value, or None if missing or expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    def set(self, key: Hashable, value: Any):
+        """Store a value, evicting the least recently used entry when full."""
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    async def get_or_fetch(self, key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Return the cached value, or fetch and cache it. Concurrent misses for the
+        same key share a single fetch; failures are passed to every waiter and
+        are not cached.
+
+        Args:
+            key: Cache key
+            fetch: Coroutine function producing the value
+
+        Returns:
+            The cached or freshly fetched value
+        """
+        value = self.get(key)
+        if value is not None:
+            return value
+
+        async def fetch_and_store():
+            value = await fetch()
+            self.set(key, value)
+            return value
+
+        return await self._in_flight.run(key, fetch_and_store)
+
+class _Call:
+    """A shared call and the number of callers still waiting for it."""
+    __slots__ = ('task', 'waiters')
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+class InFlight:
+    """Coalesces concurrent calls for the same key into a single call."""
+
+    def __init__(self):
+        self._pending: Dict[Hashable, _Call] = {}
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    async def run(self, key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Await the call already running for this key, or start one. The call runs
+        as its own task, so a cancelled caller does not cancel the others; it is
+        cancelled only once every caller has gone.
+
+        Args:
+            key: Identifies identical calls
+            fetch: Coroutine function making the call
+
+        Returns:
+            The result of the shared call
+        """
+        # No await between the lookup and the insert, so no lock is needed
+        call = self._pending.get(key)
+        if call is None:
+            call = self._pending[key] = _Call(asyncio.ensure_future(fetch()))
+            call.task.add_done_callback(lambda task: self._finish(key, call))
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        except asyncio.CancelledError:
+            if call.waiters == 1 and not call.task.done():
+                # Nobody else is waiting; later callers start a fresh call
+                self._forget(key, call)
+                call.task.cancel()
+            raise
+        finally:
+            call.waiters -= 1
+
+    def _finish(self, key: Hashable, call: _Call):
+        """Drop a finished call, marking its exception retrieved when nobody was waiting."""
+        self._forget(key, call)
+        if not call.task.cancelled():
+            call.task.exception()
+
+    def _forget(self, key: Hashable, call: _Call):
+        if self._pending.get(key) is call:
+            del self._pending[key]
@@ -0,0 +1,55 @@
+"""
+This module provides an on-disk cache for HTTP response bodies.
+Entries are served without a request while fresh, and revalidated with
+If-None-Match once stale so an unchanged response costs only a 304.
+"""
+
+import logging
+import os
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+import orjson
+
+@dataclass(slots=True)
+class CachedResponse:
+    body: bytes
+    etag: Optional[str]
+    stored_at: float
+
+class DiskHTTPCache:
+    def __init__(self, base_path: str, ttl: float = 300.0):
+        """
+        Args:
+            base_path: Directory holding one file per cached response
+            ttl: Seconds a response is used without revalidation
+        """
+        self.logger = logging.getLogger(__name__)
+        self.base_path = Path(base_path)
+        self.base_path.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        """Return the stored response, fresh or stale, or None if there is none."""
+        try:
+            entry = orjson.loads((self.base_path / f"{key}.json").read_bytes())
+            return CachedResponse(entry["body"].encode(), entry["etag"], entry["stored_at"])
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            self.logger.error(f"Error reading cached response {key}: {str(e)}")
+            return None
+
+    def is_fresh(self, entry: CachedResponse) -> bool:
+        return time.time() - entry.stored_at < self.ttl
+
+    def set(self, key: str, body: bytes, etag: Optional[str]):
+        """Store a response body, replacing the file atomically."""
+        path = self.base_path / f"{key}.json"
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            tmp_path.write_bytes(orjson.dumps({"body": body.decode(), "etag": etag, "stored_at": time.time()}))
+            os.replace(tmp_path, path)
+        except Exception as e:
+            self.logger.error(f"Error writing cached response {key}: {str(e)}")
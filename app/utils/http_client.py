@@ -0,0 +1,100 @@
+"""
+This module provides a pooled async HTTP client for outbound API calls.
+"""
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional
+import aiohttp
+from app.core.rate_limiter import AIMDLimiter
+
+# Only idempotent requests are retried, and only on transient statuses
+_RETRY_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS'})
+_RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+class AsyncHTTPClient:
+    def __init__(self, headers: Dict[str, str], concurrency: int, timeout: float, limit_per_host: int = 64,
+                 limiter: Optional[AIMDLimiter] = None, retries: int = 0, backoff_factor: float = 0.3):
+        """
+        Args:
+            headers: Headers sent with every request
+            concurrency: Maximum number of requests in flight at once
+            timeout: Total timeout per request in seconds
+            limit_per_host: Connection pool size per host
+            limiter: Optional adaptive rate limiter applied inside the concurrency cap
+            retries: Retries for idempotent requests that fail to connect, time out or get a transient status
+            backoff_factor: Retry n waits backoff_factor * 2**n seconds
+        """
+        self.headers = headers
+        self.concurrency = concurrency
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.limit_per_host = limit_per_host
+        self.limiter = limiter
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _ensure_session(self):
+        """Create the session on first use, and again if the event loop has changed."""
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit_per_host=self.limit_per_host,
+                    ttl_dns_cache=300,
+                    keepalive_timeout=30
+                ),
+                headers=self.headers,
+                timeout=self.timeout
+            )
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+            self._loop = loop
+
+    @asynccontextmanager
+    async def request(self, method: str, url: str, **kwargs) -> AsyncIterator[aiohttp.ClientResponse]:
+        """Send a request once a concurrency slot is free and yield the response."""
+        self._ensure_session()
+        retries = self.retries if method.upper() in _RETRY_METHODS else 0
+        async with self._semaphore:
+            for attempt in range(retries + 1):
+                last_attempt = attempt == retries
+                try:
+                    response = await self._send(method, url, **kwargs)
+                except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                    if last_attempt:
+                        raise
+                else:
+                    if last_attempt or response.status not in _RETRY_STATUSES:
+                        break
+                    response.release()
+
+                # Retry-After is honoured by the limiter before the next attempt
+                await asyncio.sleep(self.backoff_factor * 2 ** attempt)
+
+            try:
+                yield response
+            finally:
+                response.release()
+
+    async def _send(self, method: str, url: str, **kwargs) -> aiohttp.ClientResponse:
+        """Send one request, reporting its outcome to the limiter if there is one."""
+        if self.limiter is None:
+            return await self._session.request(method, url, **kwargs)
+
+        async with self.limiter.slot():
+            start = time.monotonic()
+            try:
+                response = await self._session.request(method, url, **kwargs)
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                self.limiter.note(None, latency=time.monotonic() - start)
+                raise
+            self.limiter.note(response.status, response.headers, time.monotonic() - start)
+            return response
+
+    async def close(self):
+        """Close the underlying session."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
@@ -1,5 +1,6 @@
 import uvicorn
-from app.api.main import app
 
 if __name__ == "__main__":
-    uvicorn.run(app, host="0.0.0.0", port=8000, reload=True) 
\ No newline at end of file
+    # uvloop and httptools replace the default asyncio loop and HTTP parser.
+    # Carts are kept in process memory, so this runs a single worker.
+    uvicorn.run("app.api.main:app", host="0.0.0.0", port=8000, loop="uvloop", http="httptools")
\ No newline at end of file